@@ -0,0 +1,102 @@
+"""Cold-start benchmark: time-to-first-render for every page.
+
+Each sample runs one page in a fresh interpreter with Streamlit's AppTest,
+so module imports (pandas, supabase, ...) are paid again every time, just
+like the first visit after a server restart. Streamlit itself is imported
+before the clock starts. Supabase points at a closed local port, so
+queries fail fast and the numbers measure our own code, not the network.
+
+    python bench/cold_start.py                    # current tree
+    python bench/cold_start.py --baseline HEAD~1  # compare against a git ref
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [
+    "streamlit_app.py",
+    "pages/AutoStack.py",
+    "pages/DUPRmatch.py",
+    "pages/Player Profile.py",
+    "pages/Players Leader Board.py",
+    "pages/Schedules.py",
+]
+
+# Runs inside the child interpreter: argv = [tree, page]
+_CHILD = r"""
+import json, os, sys, time
+tree, page = sys.argv[1], sys.argv[2]
+os.chdir(tree)
+sys.path.insert(0, tree)
+from streamlit.testing.v1 import AppTest
+
+heavy = ("pandas", "numpy", "openpyxl", "supabase", "PIL")
+at = AppTest.from_file(os.path.join(tree, page), default_timeout=60)
+at.secrets["SUPABASE_URL"] = "http://127.0.0.1:9"
+at.secrets["SUPABASE_KEY"] = "bench.bench.bench"
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in heavy if m in sys.modules],
+    "exception": bool(at.exception),
+}))
+"""
+
+
+def run_page(tree, page):
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, tree, page],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench_tree(tree, repeats):
+    results = {}
+    for page in PAGES:
+        if not os.path.exists(os.path.join(tree, page)):
+            continue
+        samples = [run_page(tree, page) for _ in range(repeats)]
+        results[page] = {
+            "median_ms": statistics.median(s["seconds"] for s in samples) * 1000,
+            "loaded": samples[-1]["loaded"],
+            "exception": any(s["exception"] for s in samples),
+        }
+    return results
+
+def export_ref(ref):
+    """Extract the tree at a git ref into a temporary directory."""
+    tmp = tempfile.mkdtemp(prefix="coldstart-")
+    archive = os.path.join(tmp, "tree.tar")
+    subprocess.run(["git", "-C", ROOT, "archive", "-o", archive, ref], check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(tmp)
+    os.remove(archive)
+    return tmp
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", help="git ref to compare against (e.g. HEAD~1)")
+    args = parser.parse_args()
+
+    after = bench_tree(ROOT, args.repeats)
+    before = bench_tree(export_ref(args.baseline), args.repeats) if args.baseline else {}
+
+    print(f"{'page':<32}{'before ms':>11}{'after ms':>11}  heavy modules loaded (after)")
+    for page, r in after.items():
+        b = before.get(page)
+        b_ms = f"{b['median_ms']:.0f}" if b else "-"
+        flag = " (page raised)" if r["exception"] else ""
+        print(f"{page:<32}{b_ms:>11}{r['median_ms']:>11.0f}  {', '.join(r['loaded']) or '-'}{flag}")
+
+
+if __name__ == "__main__":
+    main()
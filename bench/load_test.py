@@ -0,0 +1,317 @@
+"""Concurrent-session load test for the AutoStack page.
+
+Starts the app locally with the in-memory Supabase stand-in
+(LOCAL_SUPABASE=1), then opens many websocket sessions that speak
+Streamlit's protocol directly:
+
+- viewers rerun the page every --refresh-ms, like the courtside tabs
+  driven by st_autorefresh;
+- operators add players, submit scores and swap players through the same
+  widgets a person would use.
+
+Events and profiles go to a temporary directory (AUTOSTACK_EVENTS_DIR /
+AUTOSTACK_PROFILES_DIR) that is removed afterwards, so runs leave nothing
+in the working tree.
+
+Reports rerun throughput, latency percentiles, and server CPU and RSS,
+including RSS per connected session. CPU/RSS come from /proc, so Linux only;
+the websocket client is the `websockets` package (installed with supabase).
+
+    python bench/load_test.py --viewers 50 --operators 4 --duration 60
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_NAME = "AutoStack"
+
+
+# ======================================================
+# SERVER
+# ======================================================
+def start_server(port, players, data_dir):
+    env = dict(
+        os.environ,
+        LOCAL_SUPABASE="1",
+        LOCAL_SUPABASE_PLAYERS=str(players),
+        AUTOSTACK_EVENTS_DIR=os.path.join(data_dir, "events"),
+        AUTOSTACK_PROFILES_DIR=os.path.join(data_dir, "profiles"),
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def wait_healthy(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError("streamlit did not become healthy")
+
+
+class ProcSampler:
+    """CPU seconds and RSS of one process, read from /proc."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK")
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 (1-based) of the full line
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+
+# ======================================================
+# SESSION (one simulated browser tab)
+# ======================================================
+class Session:
+    def __init__(self, port, query):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.query = query
+        self.ws = None
+        self.widgets = {}  # label -> (kind, id, options)
+        self.sticky = {}   # widget id -> WidgetState kept across reruns, like the browser does
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws:
+            await self.ws.close()
+
+    async def rerun(self, states=()):
+        """Send one rerun and wait for the script to finish. Returns seconds."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query
+        msg.rerun_script.page_name = PAGE_NAME
+        for state in list(self.sticky.values()) + list(states):
+            msg.rerun_script.widget_states.widgets.append(state)
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype in ("button", "number_input", "selectbox"):
+                    w = getattr(element, etype)
+                    options = list(w.options) if etype == "selectbox" else []
+                    widgets[w.label] = (etype, w.id, options)
+            elif kind == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+                widgets = {}  # st.rerun(): a fresh run follows
+        self.widgets = widgets
+        return time.perf_counter() - start
+
+    # ---- widget state helpers ----
+    def _state(self, label):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        if label not in self.widgets:
+            return None
+        state = WidgetState()
+        state.id = self.widgets[label][1]
+        return state
+
+    def trigger(self, label):
+        state = self._state(label)
+        if state is not None:
+            state.trigger_value = True
+        return state
+
+    def choose(self, label, value, sticky=False):
+        state = self._state(label)
+        if state is not None:
+            state.string_value = value
+            if sticky:
+                self.sticky[state.id] = state
+        return state
+
+    def number(self, label, value, sticky=False):
+        state = self._state(label)
+        if state is not None:
+            state.double_value = value
+            if sticky:
+                self.sticky[state.id] = state
+        return state
+
+    def options(self, label):
+        return self.widgets.get(label, (None, None, []))[2]
+
+
+# ======================================================
+# SCENARIO
+# ======================================================
+async def setup_event(port, query, courts, players):
+    """Set the court count, add players and press Start Games."""
+    s = Session(port, query)
+    await s.connect()
+    await s.rerun()
+    await s.rerun([s.number("Number of Courts", courts)])
+    names = [o for o in s.options("Select Registered Player") if o]
+    for name in names[:players]:
+        await s.rerun([s.choose("Select Registered Player", name), s.trigger("Add Player")])
+    await s.rerun([s.trigger("Start Games")])
+    await s.close()
+
+async def viewer(port, query, refresh, stop_at, stats):
+    s = Session(port, query)
+    await s.connect()
+    # Spread the first refreshes out like tabs opened at different times
+    await asyncio.sleep(random.random() * refresh)
+    while time.monotonic() < stop_at:
+        tick = time.monotonic()
+        try:
+            stats["viewer"].append(await s.rerun())
+        except Exception:
+            stats["errors"] += 1
+            return
+        await asyncio.sleep(max(0.0, refresh - (time.monotonic() - tick)))
+    await s.close()
+
+async def operator(port, query, think, stop_at, stats):
+    s = Session(port, query)
+    await s.connect()
+    await s.rerun()
+    while time.monotonic() < stop_at:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think)
+        try:
+            busy = [o for o in s.options("🎯 Manage Court") if not o.endswith("(free)")]
+            if busy:
+                # Open a busy court first, then act on its controls
+                await s.rerun([s.choose("🎯 Manage Court", random.choice(busy), sticky=True)])
+            action = random.choice(["score", "score", "swap", "add"])
+            if action == "score" and "✅ Submit Score" in s.widgets:
+                states = [
+                    s.number("Score A", 11),
+                    s.number("Score B", random.randint(0, 9)),
+                    s.trigger("✅ Submit Score"),
+                ]
+            elif action == "swap" and "🔄 Swap Players" in s.widgets:
+                states = [
+                    s.choose("Player OUT (from court)", random.choice(s.options("Player OUT (from court)"))),
+                    s.choose("Player IN (from waiting)", random.choice(s.options("Player IN (from waiting)"))),
+                    s.trigger("🔄 Swap Players"),
+                ]
+            else:
+                names = [o for o in s.options("Select Registered Player") if o]
+                if not names:
+                    await s.rerun()
+                    continue
+                states = [s.choose("Select Registered Player", random.choice(names)), s.trigger("Add Player")]
+            stats["operator"].append(await s.rerun([state for state in states if state is not None]))
+            stats["actions"][action] = stats["actions"].get(action, 0) + 1
+        except Exception:
+            stats["errors"] += 1
+            return
+    await s.close()
+
+async def sample_server(sampler, stop_at, samples):
+    while time.monotonic() < stop_at:
+        samples.append((time.monotonic(), sampler.cpu_seconds(), sampler.rss_bytes()))
+        await asyncio.sleep(0.5)
+
+
+def pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))] * 1000
+
+async def run(args):
+    query = urlencode({"club": "loadtest", "event": f"run-{int(time.time())}"})
+    data_dir = tempfile.mkdtemp(prefix="autostack-load-")
+    server = start_server(args.port, args.players + 16, data_dir)
+    try:
+        wait_healthy(args.port)
+        sampler = ProcSampler(server.pid)
+        await setup_event(args.port, query, args.courts, args.players)
+
+        idle_rss = sampler.rss_bytes()
+        stats = {"viewer": [], "operator": [], "actions": {}, "errors": 0}
+        samples = []
+        start = time.monotonic()
+        stop_at = start + args.duration
+        cpu_start = sampler.cpu_seconds()
+        tasks = [sample_server(sampler, stop_at, samples)]
+        tasks += [viewer(args.port, query, args.refresh_ms / 1000, stop_at, stats) for _ in range(args.viewers)]
+        tasks += [operator(args.port, query, args.think_s, stop_at, stats) for _ in range(args.operators)]
+        await asyncio.gather(*tasks)
+        wall = time.monotonic() - start
+        cpu = sampler.cpu_seconds() - cpu_start
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    sessions = args.viewers + args.operators
+    peak_rss = max(s[2] for s in samples) if samples else idle_rss
+    reruns = len(stats["viewer"]) + len(stats["operator"])
+    print(f"sessions        {args.viewers} viewers + {args.operators} operators, {wall:.0f}s")
+    print(f"reruns          {reruns} ({reruns / wall:.1f}/s), errors {stats['errors']}")
+    print(f"viewer rerun    p50 {pct(stats['viewer'], 50):.0f} ms  p90 {pct(stats['viewer'], 90):.0f} ms  "
+          f"p99 {pct(stats['viewer'], 99):.0f} ms")
+    print(f"operator action p50 {pct(stats['operator'], 50):.0f} ms  p90 {pct(stats['operator'], 90):.0f} ms  "
+          f"p99 {pct(stats['operator'], 99):.0f} ms  {stats['actions']}")
+    print(f"server CPU      {100 * cpu / wall:.0f}% of one core")
+    print(f"server RSS      idle {idle_rss / 2**20:.0f} MB, peak {peak_rss / 2**20:.0f} MB, "
+          f"{(peak_rss - idle_rss) / max(sessions, 1) / 1024:.0f} KB per session")
+    if stats["viewer"]:
+        print(f"mean rerun      {statistics.mean(stats['viewer']) * 1000:.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--operators", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load after setup")
+    parser.add_argument("--refresh-ms", type=int, default=1000, help="viewer rerun interval")
+    parser.add_argument("--think-s", type=float, default=3, help="mean pause between operator actions")
+    parser.add_argument("--courts", type=int, default=6)
+    parser.add_argument("--players", type=int, default=32, help="players added before Start Games")
+    parser.add_argument("--port", type=int, default=8599)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""DUPR Fair Match schedule building and incremental repair.
+
+Players are plain dicts with at least Name, DUPR_ID and Rating (rows of the
+uploaded sheet). A schedule is the list of match rows shown on the page.
+"""
+import math
+import random
+from collections import defaultdict
+
+import numpy as np
+
+MIN_COURT_PLAYERS = 4
+
+
+# ============================
+# SPLIT PLAYERS BY SKILL
+# ============================
+def split_courts(players, num_courts):
+    """Contiguous chunks of the rating-sorted players, ceil(n / courts) each."""
+    players_per_court = math.ceil(len(players) / num_courts)
+    return [
+        players[i * players_per_court:(i + 1) * players_per_court]
+        for i in range(num_courts)
+    ]
+
+def balanced_courts(players, num_courts, max_size=None, key="Rating"):
+    """
+    Split rating-sorted players into contiguous courts of 4..max_size players
+    with the least total within-court rating variance.
+
+    Optimal 1-D segmentation: a DP over courts where each step scores every
+    (end, size) pair at once from prefix sums of the ratings. Uses fewer
+    courts when there are not 4 players for each, so every court returned is
+    playable. max_size defaults to one above an even split and is raised if
+    it cannot fit everyone.
+    """
+    n = len(players)
+    num_courts = min(num_courts, n // MIN_COURT_PLAYERS)
+    if num_courts < 1:
+        return []
+    even = math.ceil(n / num_courts)
+    max_size = max(even, max_size if max_size is not None else even + 1)
+
+    ratings = np.array([p[key] for p in players], dtype=float)
+    s1 = np.concatenate([[0.0], np.cumsum(ratings)])
+    s2 = np.concatenate([[0.0], np.cumsum(ratings ** 2)])
+    sizes = np.arange(MIN_COURT_PLAYERS, max_size + 1)
+    ends = np.arange(n + 1)
+    starts = ends[:, None] - sizes[None, :]
+    valid = starts >= 0
+    starts = np.where(valid, starts, 0)
+    # Sum of squared deviations of every segment [start, end)
+    cost = (s2[ends][:, None] - s2[starts]) - (s1[ends][:, None] - s1[starts]) ** 2 / sizes
+    cost[~valid] = np.inf
+
+    best = np.full(n + 1, np.inf)
+    best[0] = 0.0
+    back = []
+    for _ in range(num_courts):
+        total = best[starts] + cost
+        choice = np.argmin(total, axis=1)
+        best = total[ends, choice]
+        back.append(starts[ends, choice])
+
+    bounds = [n]
+    for step in reversed(back):
+        bounds.append(int(step[bounds[-1]]))
+    bounds.reverse()
+    return [players[a:b] for a, b in zip(bounds, bounds[1:])]
+
+def court_spread(courts_players, key="Rating"):
+    """Per-court size and rating spread, for comparing split methods."""
+    rows = []
+    for court_number, court_players in enumerate(courts_players, start=1):
+        ratings = np.array([p[key] for p in court_players], dtype=float)
+        rows.append({
+            "Court": court_number,
+            "Players": len(court_players),
+            "Playable": len(court_players) >= MIN_COURT_PLAYERS,
+            "Min": round(float(ratings.min()), 3) if len(ratings) else None,
+            "Max": round(float(ratings.max()), 3) if len(ratings) else None,
+            "Spread": round(float(np.ptp(ratings)), 3) if len(ratings) else None,
+            "Std Dev": round(float(ratings.std()), 3) if len(ratings) else None,
+        })
+    return rows
+
+def court_assignments(courts_players, extra_columns=()):
+    rows = []
+    for court_number, court_players in enumerate(courts_players, start=1):
+        for p in court_players:
+            rows.append({
+                "Court": court_number,
+                "Player Name": p["Name"],
+                "DUPR_ID": p["DUPR_ID"],
+                "Rating": p["Rating"],
+                **{c: p.get(c) for c in extra_columns}
+            })
+    return rows
+
+
+# ============================
+# GENERATE MATCHES
+# ============================
+def record_partners(partner_history, team_a_names, team_b_names):
+    for a, b in (team_a_names, team_b_names):
+        partner_history[a].add(b)
+        partner_history[b].add(a)
+
+def court_matches(court_number, court_players, first_match, last_match, partner_history=None):
+    """Matches first_match..last_match for one court (needs 4+ players)."""
+    if len(court_players) < 4:
+        return []
+    court_players = list(court_players)
+    partner_history = partner_history if partner_history is not None else defaultdict(set)
+    matches = []
+
+    for match_number in range(first_match, last_match + 1):
+
+        random.shuffle(court_players)
+
+        group = court_players[:4]
+
+        # Balanced pairing (strongest + weakest)
+        group_sorted = sorted(group, key=lambda x: x["Rating"])
+        team_a = [group_sorted[0], group_sorted[-1]]
+        team_b = [group_sorted[1], group_sorted[2]]
+
+        # Avoid repeat partners
+        def repeated(team):
+            return team[1]["Name"] in partner_history[team[0]["Name"]]
+
+        if repeated(team_a) or repeated(team_b):
+            random.shuffle(group_sorted)
+            team_a = group_sorted[:2]
+            team_b = group_sorted[2:4]
+
+        record_partners(
+            partner_history,
+            (team_a[0]["Name"], team_a[1]["Name"]),
+            (team_b[0]["Name"], team_b[1]["Name"])
+        )
+
+        matches.append({
+            "Court": court_number,
+            "Match": match_number,
+            "Team A Player 1": team_a[0]["Name"],
+            "Team A Player 2": team_a[1]["Name"],
+            "Team A Avg Rating": round((team_a[0]["Rating"] + team_a[1]["Rating"]) / 2, 3),
+            "Team B Player 1": team_b[0]["Name"],
+            "Team B Player 2": team_b[1]["Name"],
+            "Team B Avg Rating": round((team_b[0]["Rating"] + team_b[1]["Rating"]) / 2, 3),
+        })
+    return matches
+
+def generate_schedule(courts_players, num_matches):
+    matches = []
+    for court_number, court_players in enumerate(courts_players, start=1):
+        matches.extend(court_matches(court_number, court_players, 1, num_matches))
+    return matches
+
+
+# ============================
+# INCREMENTAL REPAIR
+# ============================
+def average_rating(court, key="Rating"):
+    return sum(p[key] for p in court) / len(court) if court else math.inf
+
+def closest_court(courts_players, rating, key="Rating", among=None):
+    """Index of the court (of `among`, default all) whose average `key` is nearest `rating`."""
+    among = range(len(courts_players)) if among is None else among
+    return min(among, key=lambda i: abs(average_rating(courts_players[i], key) - rating))
+
+def borrow_player(courts_players, i, key="Rating"):
+    """
+    Give short court i one more player from the nearest court that can spare
+    one (more than 4). Courts are rating-sorted slices, so the player moves
+    along the chain: each court in between hands its edge player facing
+    court i (the lowest of a court above, the highest of a court below) to
+    its neighbour, keeping every court a contiguous rating range.
+
+    Returns the indices of the courts that changed (empty if none can spare).
+    """
+    options = []
+    for step in (-1, 1):
+        j = i + step
+        while 0 <= j < len(courts_players):
+            if len(courts_players[j]) > MIN_COURT_PLAYERS:
+                edge = (min if step < 0 else max)(courts_players[i + step], key=lambda p: p[key])
+                gap = abs(edge[key] - average_rating(courts_players[i], key)) if courts_players[i] else 0
+                options.append((abs(j - i), gap, j, step))
+                break
+            j += step
+    if not options:
+        return []
+    _, _, j, step = min(options)
+    changed = []
+    for k in range(j, i, -step):
+        pick = (min if step < 0 else max)(courts_players[k], key=lambda p: p[key])
+        courts_players[k].remove(pick)
+        courts_players[k - step].append(pick)
+        changed.append(k)
+    return changed + [i]
+
+def repair_schedule(matches, courts_players, num_matches, fixed_through, withdrawn=(), arrivals=(), key="Rating"):
+    """
+    Apply a roster change without reshuffling what players already know.
+
+    Matches numbered <= fixed_through (played or announced) stay exactly
+    as they are. Withdrawn players leave their courts. Arrivals first fill
+    courts left with fewer than 4 (nearest average first), then join the
+    court with the closest average `key` (the column the courts were split
+    on). A court still short borrows a player from the nearest court with
+    one to spare (see borrow_player). Only the courts touched by the change
+    get their remaining matches regenerated, with partner history seeded
+    from their fixed matches.
+
+    Returns (matches, courts_players, affected court numbers).
+    """
+    withdrawn = set(withdrawn)
+    courts_players = [list(court) for court in courts_players]
+    affected = set()
+
+    for i, court in enumerate(courts_players):
+        kept = [p for p in court if p["Name"] not in withdrawn]
+        if len(kept) != len(court):
+            courts_players[i] = kept
+            affected.add(i + 1)
+
+    def short():
+        return [i for i, court in enumerate(courts_players) if len(court) < MIN_COURT_PLAYERS]
+
+    for p in arrivals:
+        i = closest_court(courts_players, p[key], key, among=short() or None)
+        courts_players[i].append(p)
+        affected.add(i + 1)
+
+    for i in short():
+        while len(courts_players[i]) < MIN_COURT_PLAYERS:
+            changed = borrow_player(courts_players, i, key)
+            if not changed:
+                break
+            affected.update(c + 1 for c in changed)
+
+    repaired = [
+        m for m in matches
+        if m["Court"] not in affected or m["Match"] <= fixed_through
+    ]
+    for court_number in sorted(affected):
+        partner_history = defaultdict(set)
+        for m in repaired:
+            if m["Court"] == court_number:
+                record_partners(
+                    partner_history,
+                    (m["Team A Player 1"], m["Team A Player 2"]),
+                    (m["Team B Player 1"], m["Team B Player 2"])
+                )
+        repaired.extend(court_matches(
+            court_number, courts_players[court_number - 1],
+            fixed_through + 1, num_matches, partner_history
+        ))
+
+    repaired.sort(key=lambda m: (m["Court"], m["Match"]))
+    return repaired, courts_players, sorted(affected)
@@ -0,0 +1,236 @@
+"""Club/event scoped store for Auto Stack events.
+
+One process can host many clubs' sessions. Events are kept resident in an
+LRU; the least recently used (or any left idle too long) are flushed,
+written to ``events/<club>/<event>.json`` and dropped from memory, then
+reloaded transparently the next time a page asks for them.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from stack_engine import StackEvent
+
+EVENTS_DIR = os.environ.get("AUTOSTACK_EVENTS_DIR", "events")
+PROFILES_DIR = os.environ.get("AUTOSTACK_PROFILES_DIR", "profiles")
+MAX_RESIDENT_EVENTS = int(os.environ.get("AUTOSTACK_MAX_EVENTS", 200))
+MAX_RESIDENT_BYTES = int(os.environ.get("AUTOSTACK_MAX_BYTES", 256 * 1024 * 1024))
+IDLE_SECONDS = int(os.environ.get("AUTOSTACK_IDLE_SECONDS", 30 * 60))
+
+DEFAULT_CLUB = "tiradinks"
+DEFAULT_EVENT = "main"
+
+
+def slug(name):
+    """Filesystem-safe version of a club or event name."""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", name.strip()).strip("_").lower() or "default"
+
+def club_dir(root, club):
+    path = os.path.join(root, slug(club))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def profiles_dir(club, root=PROFILES_DIR):
+    """
+    Folder of a club's saved AutoStack profiles.
+
+    Profiles saved before clubs existed sit directly in `root`; they are
+    moved into the default club's folder the first time it is opened.
+    """
+    path = club_dir(root, club)
+    if slug(club) == slug(DEFAULT_CLUB):
+        for f in os.listdir(root):
+            src, dst = os.path.join(root, f), os.path.join(path, f)
+            if f.endswith(".json") and os.path.isfile(src) and not os.path.exists(dst):
+                os.replace(src, dst)
+    return path
+
+
+def write_json(path, data):
+    """Write JSON atomically: a crash mid-write leaves the old file, never a truncated one."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# ======================================================
+# STORE
+# ======================================================
+class EventStore:
+    """
+    LRU of resident events with per-event memory accounting.
+
+    The store lock only guards the LRU bookkeeping. Loading an event from
+    disk, sizing it, stopping its worker, flushing it to Supabase and writing
+    its file all happen outside it, so one large or slow event never holds
+    up other pages. An event being loaded or written out is marked busy;
+    anyone asking for it meanwhile waits for that to finish.
+    """
+
+    def __init__(self, root=EVENTS_DIR, max_events=MAX_RESIDENT_EVENTS,
+                 max_bytes=MAX_RESIDENT_BYTES, idle_seconds=IDLE_SECONDS):
+        self.root = root
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._events = OrderedDict()  # (club, event) -> StackEvent, oldest first
+        self._last_access = {}
+        self._bytes = {}
+        self._sized_version = {}
+        self._busy = {}  # key -> threading.Event set once its load or write is done
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        club, name = key
+        return os.path.join(club_dir(self.root, club), f"{name}.json")
+
+    def get(self, club, name):
+        """Return the event, loading it from disk or creating it if not resident."""
+        key = (slug(club), slug(name))
+        while True:
+            with self._lock:
+                busy = self._busy.get(key)
+                event = self._events.get(key) if busy is None else None
+                if event is not None:
+                    self._events.move_to_end(key)
+                    self._last_access[key] = time.monotonic()
+                    event.start_worker()
+                    evicted = self._evict(keep=key)
+                    break
+                if busy is None:
+                    # Not resident: this caller loads it, others wait
+                    self._busy[key] = threading.Event()
+            if busy is not None:
+                busy.wait()
+                continue
+            event = None
+            try:
+                event = self._load(key)
+            finally:
+                with self._lock:
+                    if event is not None:
+                        self._events[key] = event
+                    self._busy.pop(key).set()
+
+        for old_key, old_event in evicted:
+            self._close(old_key, old_event)
+        self._measure(key, event)
+        return event
+
+    def _load(self, key):
+        event = StackEvent(*key)
+        path = self._path(key)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                event.load_dict(json.load(f))
+        return event
+
+    def _measure(self, key, event):
+        """Re-size the event only when its state changed since the last count."""
+        version = event.version
+        if self._sized_version.get(key) == version:
+            return
+        size = event.memory_bytes()
+        with self._lock:
+            if self._events.get(key) is event:
+                self._bytes[key] = size
+                self._sized_version[key] = version
+
+    def _evict(self, keep):
+        """Take idle and over-limit events out of the LRU (under the lock); returns them."""
+        evicted = []
+        now = time.monotonic()
+        for key in list(self._events):
+            if key != keep and now - self._last_access[key] > self.idle_seconds:
+                evicted.append(self._detach(key))
+        # Oldest first until both limits hold again
+        for key in list(self._events):
+            if len(self._events) <= self.max_events and sum(self._bytes.values()) <= self.max_bytes:
+                break
+            if key != keep:
+                evicted.append(self._detach(key))
+        return evicted
+
+    def _detach(self, key):
+        event = self._events.pop(key)
+        self._last_access.pop(key, None)
+        self._bytes.pop(key, None)
+        self._sized_version.pop(key, None)
+        self._busy[key] = threading.Event()
+        return key, event
+
+    def _close(self, key, event):
+        """Stop, flush and write out a detached event (outside the lock)."""
+        try:
+            event.stop_worker()
+            event.end_session()
+            write_json(self._path(key), event.to_dict(pending_matches=True))
+        finally:
+            with self._lock:
+                self._busy.pop(key).set()
+
+    def persist_all(self):
+        """Write every resident event to disk without evicting it."""
+        with self._lock:
+            resident = list(self._events.items())
+        for key, event in resident:
+            event.end_session()
+            write_json(self._path(key), event.to_dict(pending_matches=True))
+
+    def club_history(self, club):
+        """Match history of every event of a club, resident or on disk, oldest event first."""
+        club = slug(club)
+        folder = club_dir(self.root, club)
+        # Only the bookkeeping under the lock; snapshots and file reads after
+        with self._lock:
+            resident = {name: event for (c, name), event in self._events.items() if c == club}
+            busy = [done for (c, _), done in self._busy.items() if c == club]
+        # Let events being loaded or written out finish first
+        for done in busy:
+            done.wait()
+
+        histories = []
+        for f in os.listdir(folder):
+            name = f[:-5]
+            if not f.endswith(".json") or name in resident:
+                continue
+            path = os.path.join(folder, f)
+            with open(path, "r") as fh:
+                histories.append((os.path.getmtime(path), json.load(fh).get("history", [])))
+        now = time.time()
+        for event in resident.values():
+            histories.append((now, event.snapshot()["history"]))
+        histories.sort(key=lambda h: h[0])
+        return [row for _, rows in histories for row in rows]
+
+    def stats(self, club):
+        """One club's resident events as (event, approx bytes, idle seconds), most recent first."""
+        club = slug(club)
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (name, self._bytes.get((c, name), 0), int(now - self._last_access[(c, name)]))
+                for c, name in reversed(self._events) if c == club
+            ]
+
+
+_store = EventStore()
+atexit.register(_store.persist_all)
+
+def get_event(club=DEFAULT_CLUB, name=DEFAULT_EVENT):
+    return _store.get(club, name)
+
+def store_stats(club=DEFAULT_CLUB):
+    return _store.stats(club)
+
+def club_history(club=DEFAULT_CLUB):
+    return _store.club_history(club)
@@ -0,0 +1,255 @@
+"""League and tournament fixtures: round robin, pool play and elimination brackets.
+
+Pairings come from index tables built once per field size and cached (the
+circle method for round robin, standard seed order for brackets), so a draw
+is a table lookup plus relabelling. Each format returns match dicts with a
+Stage, the two sides and a depth (how many matches must finish before this
+one can start); assign_slots then packs them onto courts and time slots.
+Teams are names in seed order.
+"""
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+
+FORMATS = ("Round Robin", "Pool Play", "Single Elimination", "Double Elimination")
+BYE = None
+
+
+# ============================
+# FIXTURE TABLES
+# ============================
+@lru_cache(maxsize=None)
+def circle_table(n):
+    """
+    (rounds, n // 2, 2) seat pairs for an even field by the circle method.
+
+    Seat 0 stays put while the other seats rotate one place per round, so
+    every pair meets exactly once in n - 1 rounds. Seat 0 swaps sides every
+    other round to even out who is listed first.
+    """
+    m = n - 1
+    ring = (np.arange(m)[:, None] + np.arange(m)[None, :]) % m + 1
+    seats = np.hstack([np.zeros((m, 1), dtype=np.int64), ring])
+    table = np.stack([seats[:, :n // 2], seats[:, ::-1][:, :n // 2]], axis=2)
+    table[1::2, 0] = table[1::2, 0, ::-1]
+    table.setflags(write=False)
+    return table
+
+@lru_cache(maxsize=None)
+def seed_order(size):
+    """1-based seeds in bracket line order, so seeds 1 and 2 can only meet in the final."""
+    order = np.array([1])
+    while len(order) < size:
+        order = np.stack([order, 2 * len(order) + 1 - order], axis=1).ravel()
+    order.setflags(write=False)
+    return order
+
+
+# ============================
+# ROUND ROBIN / POOLS
+# ============================
+def round_robin(teams, stage="Round"):
+    """Every team plays every other once; odd fields give one team a bye per round."""
+    teams = list(teams)
+    if len(teams) < 2:
+        return []
+    seats = teams + [BYE] if len(teams) % 2 else teams
+    matches = []
+    for r, pairs in enumerate(circle_table(len(seats)), start=1):
+        for a, b in pairs:
+            if seats[a] is BYE or seats[b] is BYE:
+                continue
+            matches.append({"Stage": f"{stage} {r}", "Team A": seats[a], "Team B": seats[b], "depth": r})
+    return matches
+
+def split_pools(teams, num_pools):
+    """Snake-seed teams into pools (1, 2, ..., p, p, ..., 2, 1, ...)."""
+    i = np.arange(len(teams))
+    col = i % num_pools
+    pool = np.where((i // num_pools) % 2 == 0, col, num_pools - 1 - col)
+    return [[teams[j] for j in np.flatnonzero(pool == p)] for p in range(num_pools)]
+
+def pool_play(teams, num_pools):
+    """A round robin inside each pool; pools play their rounds side by side."""
+    matches = []
+    for p, pool in enumerate(split_pools(list(teams), num_pools)):
+        matches.extend(round_robin(pool, stage=f"Pool {chr(ord('A') + p)} · Round"))
+    return matches
+
+
+# ============================
+# ELIMINATION BRACKETS
+# ============================
+class _Bracket:
+    """
+    Matches whose sides are team names or ("W"/"L", key) references.
+
+    Matches against a bye are not played: the other side walks over, and
+    references to its winner/loser resolve to that side/BYE straight away.
+    """
+
+    def __init__(self):
+        self.matches = []
+        self.depths = {}
+        self.walkovers = {}
+
+    def resolve(self, side):
+        while isinstance(side, tuple) and side[1] in self.walkovers:
+            winner, loser = self.walkovers[side[1]]
+            side = winner if side[0] == "W" else loser
+        return side
+
+    def depth(self, side):
+        return self.depths[side[1]] if isinstance(side, tuple) else 0
+
+    def match(self, key, stage, a, b):
+        a, b = self.resolve(a), self.resolve(b)
+        if a is BYE or b is BYE:
+            self.walkovers[key] = (b if a is BYE else a, BYE)
+            return
+        depth = 1 + max(self.depth(a), self.depth(b))
+        self.depths[key] = depth
+        self.matches.append({"key": key, "Stage": stage, "Team A": a, "Team B": b, "depth": depth})
+
+def _round_name(r, rounds, prefix=""):
+    if prefix:
+        return f"{prefix} Final" if r == rounds else f"{prefix} R{r}"
+    return {rounds: "Final", rounds - 1: "Semifinal", rounds - 2: "Quarterfinal"}.get(r, f"Round {r}")
+
+def _winners_bracket(bracket, teams, prefix=""):
+    """Seeded winners bracket; returns the match keys of each round."""
+    size = 1 << max(1, (len(teams) - 1).bit_length())
+    rounds = size.bit_length() - 1
+    sides = [teams[s - 1] if s <= len(teams) else BYE for s in seed_order(size)]
+    keys = []
+    for r in range(1, rounds + 1):
+        round_keys = []
+        for i in range(0, len(sides), 2):
+            key = ("WB", r, i // 2)
+            bracket.match(key, _round_name(r, rounds, prefix), sides[i], sides[i + 1])
+            round_keys.append(key)
+        keys.append(round_keys)
+        sides = [("W", k) for k in round_keys]
+    return keys
+
+def single_elimination(teams):
+    teams = list(teams)
+    if len(teams) < 2:
+        return []
+    bracket = _Bracket()
+    _winners_bracket(bracket, teams)
+    return _labelled(bracket)
+
+def double_elimination(teams):
+    """
+    Winners and losers brackets plus a grand final (and a reset match if the
+    losers-bracket champion wins it). Losers of each winners round drop into
+    the losers bracket in alternating order to delay rematches.
+    """
+    teams = list(teams)
+    if len(teams) < 2:
+        return []
+    bracket = _Bracket()
+    wb = _winners_bracket(bracket, teams, prefix="Winners")
+
+    lb_round = 0
+
+    def lb_matches(pairs):
+        nonlocal lb_round
+        lb_round += 1
+        winners = []
+        for i, (a, b) in enumerate(pairs):
+            key = ("LB", lb_round, i)
+            bracket.match(key, f"Losers R{lb_round}", a, b)
+            winners.append(("W", key))
+        return winners
+
+    def paired(sides):
+        return list(zip(sides[0::2], sides[1::2]))
+
+    lb = [("L", k) for k in wb[0]]
+    if len(lb) > 1:
+        lb = lb_matches(paired(lb))
+    for r in range(2, len(wb) + 1):
+        drops = [("L", k) for k in wb[r - 1]]
+        if r % 2 == 0:
+            drops.reverse()
+        lb = lb_matches(list(zip(lb, drops)))
+        if len(lb) > 1:
+            lb = lb_matches(paired(lb))
+
+    # Renamed so the last losers round reads as its final
+    for m in bracket.matches:
+        if m["key"][0] == "LB" and m["key"][1] == lb_round:
+            m["Stage"] = "Losers Final"
+
+    bracket.match(("GF", 1), "Grand Final", ("W", wb[-1][0]), lb[0])
+    bracket.match(("GF", 2), "Grand Final (if needed)", ("W", ("GF", 1)), ("L", ("GF", 1)))
+    return _labelled(bracket)
+
+def _labelled(bracket):
+    """Drop internal keys, turning references into "Winner/Loser M<n>" labels."""
+    order = sorted(range(len(bracket.matches)), key=lambda i: bracket.matches[i]["depth"])
+    number = {bracket.matches[i]["key"]: n for n, i in enumerate(order, start=1)}
+
+    def label(side):
+        if isinstance(side, tuple):
+            return f"{'Winner' if side[0] == 'W' else 'Loser'} M{number[side[1]]}"
+        return side
+
+    return [
+        {"Stage": m["Stage"], "Team A": label(m["Team A"]), "Team B": label(m["Team B"]), "depth": m["depth"]}
+        for m in (bracket.matches[i] for i in order)
+    ]
+
+
+# ============================
+# COURTS AND TIME SLOTS
+# ============================
+def build_fixtures(fmt, teams, num_pools=2):
+    if fmt == "Round Robin":
+        return round_robin(teams)
+    if fmt == "Pool Play":
+        return pool_play(teams, num_pools)
+    if fmt == "Single Elimination":
+        return single_elimination(teams)
+    if fmt == "Double Elimination":
+        return double_elimination(teams)
+    raise ValueError(f"Unknown format: {fmt}")
+
+def assign_slots(matches, num_courts, start, slot_minutes):
+    """
+    Schedule rows with Match, Slot, Day, Time and Court.
+
+    Matches of equal depth never share a team and only wait on shallower
+    ones, so each depth is packed onto the courts in consecutive slots and
+    the next depth starts in the slot after.
+    """
+    if not matches:
+        return []
+    depth = np.array([m["depth"] for m in matches])
+    order = np.argsort(depth, kind="stable")
+    d = depth[order]
+    levels, counts = np.unique(d, return_counts=True)
+    slots_per_level = -(-counts // num_courts)
+    level_start = np.concatenate([[0], np.cumsum(slots_per_level)[:-1]])
+    position = np.arange(len(d)) - np.searchsorted(d, d, side="left")
+    slot = level_start[np.searchsorted(levels, d)] + position // num_courts
+    court = position % num_courts + 1
+
+    rows = []
+    for n, (i, s, c) in enumerate(zip(order.tolist(), slot.tolist(), court.tolist()), start=1):
+        m = matches[i]
+        when = start + timedelta(minutes=s * slot_minutes)
+        rows.append({
+            "Match": n,
+            "Stage": m["Stage"],
+            "Slot": s + 1,
+            "Day": (when.date() - start.date()).days + 1,
+            "Time": when.strftime("%H:%M"),
+            "Court": c,
+            "Team A": m["Team A"],
+            "Team B": m["Team B"],
+        })
+    return rows
@@ -0,0 +1,62 @@
+"""Pre-resized TDphoto.jpg variants served from Streamlit's static route.
+
+The source image is decoded and resized once per process into
+``static/``; pages then reference the files by URL instead of sending the
+image bytes through ``st.image`` on every rerun. File names carry a hash of
+the source so browsers can keep their copy until the photo changes.
+"""
+import hashlib
+import os
+
+import streamlit as st
+
+SOURCE = "TDphoto.jpg"
+STATIC_DIR = "static"
+STATIC_URL = "app/static"
+WIDTHS = (300, 600, 1600)
+
+
+def _variant_name(digest, width, ext):
+    return f"TDphoto-{width}-{digest}.{ext}"
+
+@st.cache_resource(show_spinner=False)
+def build_variants():
+    """Write JPEG and WebP variants for every width; returns {(width, ext): url}."""
+    with open(SOURCE, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:10]
+    os.makedirs(STATIC_DIR, exist_ok=True)
+
+    urls = {}
+    missing = []
+    for width in WIDTHS:
+        for ext in ("jpg", "webp"):
+            name = _variant_name(digest, width, ext)
+            urls[(width, ext)] = f"{STATIC_URL}/{name}"
+            if not os.path.exists(os.path.join(STATIC_DIR, name)):
+                missing.append((width, ext, name))
+
+    if missing:
+        from PIL import Image
+
+        with Image.open(SOURCE) as img:
+            img = img.convert("RGB")
+            for width, ext, name in missing:
+                height = round(img.height * width / img.width)
+                resized = img.resize((width, height), Image.LANCZOS)
+                fmt = "JPEG" if ext == "jpg" else "WEBP"
+                resized.save(os.path.join(STATIC_DIR, name), fmt, quality=82, optimize=True)
+    return urls
+
+def header_photo(width=300):
+    """Centered header photo, 1x/2x WebP with a JPEG fallback."""
+    urls = build_variants()
+    st.markdown(
+        f'<picture style="display:block;text-align:center">'
+        f'<source type="image/webp" srcset="{urls[(width, "webp")]} 1x, {urls[(width * 2, "webp")]} 2x">'
+        f'<img src="{urls[(width, "jpg")]}" width="{width}" alt="TiraDinks">'
+        f'</picture>',
+        unsafe_allow_html=True
+    )
+
+def background_url():
+    return build_variants()[(WIDTHS[-1], "webp")]
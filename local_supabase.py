@@ -0,0 +1,136 @@
+"""In-memory stand-in for the Supabase client, for load tests and offline runs.
+
+Enabled by setting LOCAL_SUPABASE=1 (see supabase_client.get_supabase). It
+implements only the query-builder calls this app makes. The players table
+is seeded with LOCAL_SUPABASE_PLAYERS synthetic players, and
+LOCAL_SUPABASE_LATENCY_MS adds a fixed delay per request to mimic the
+network round trip.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+SKILLS = ("BEGINNER", "NOVICE", "INTERMEDIATE")
+
+
+def seed_players(count):
+    now = datetime.now().isoformat()
+    return [
+        {
+            "id": i,
+            "name": f"Player {i:03d}",
+            "dupr": f"LOCAL{i:03d}",
+            "skill": SKILLS[i % len(SKILLS)],
+            "games": 0,
+            "wins": 0,
+            "created_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+class LocalResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class LocalQuery:
+    """Chainable subset of postgrest's query builder over a list of dict rows."""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._payload = None
+        self._filters = []
+        self._order = None
+        self._range = None
+
+    # ---- actions ----
+    def select(self, *columns):
+        self._action = "select"
+        return self
+
+    def insert(self, rows):
+        self._action = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        self._action = "update"
+        self._payload = values
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # ---- filters / modifiers ----
+    def eq(self, column, value):
+        self._filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(lambda r: r.get(column) is not None and r.get(column) >= value)
+        return self
+
+    def contains(self, column, values):
+        self._filters.append(lambda r: set(values) <= set(r.get(column) or []))
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def execute(self):
+        if self._client.latency:
+            time.sleep(self._client.latency)
+        with self._client.lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            matched = [r for r in rows if all(f(r) for f in self._filters)]
+
+            if self._action == "insert":
+                inserted = []
+                for row in self._payload:
+                    row = dict(row)
+                    row.setdefault("id", self._client.next_id())
+                    row.setdefault("created_at", datetime.now().isoformat())
+                    rows.append(row)
+                    inserted.append(dict(row))
+                return LocalResponse(inserted)
+            if self._action == "update":
+                for r in matched:
+                    r.update(self._payload)
+                return LocalResponse([dict(r) for r in matched])
+            if self._action == "delete":
+                self._client.tables[self._table] = [r for r in rows if r not in matched]
+                return LocalResponse([dict(r) for r in matched])
+
+            if self._order:
+                column, desc = self._order
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            if self._range:
+                matched = matched[self._range[0]:self._range[1] + 1]
+            return LocalResponse([dict(r) for r in matched])
+
+
+class LocalClient:
+    def __init__(self, players=None, latency_ms=None):
+        players = int(os.environ.get("LOCAL_SUPABASE_PLAYERS", 64)) if players is None else players
+        latency_ms = float(os.environ.get("LOCAL_SUPABASE_LATENCY_MS", 0)) if latency_ms is None else latency_ms
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.tables = {"players": seed_players(players), "matches": []}
+        self._id = players
+
+    def next_id(self):
+        self._id += 1
+        return self._id
+
+    def table(self, name):
+        return LocalQuery(self, name)
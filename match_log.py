@@ -0,0 +1,102 @@
+"""Buffered writes of finished Auto Stack matches to the Supabase ``matches`` table.
+
+Rows are collected per event and sent as one multi-row insert every
+FLUSH_EVERY matches or FLUSH_SECONDS, whichever comes first, and again when
+the event is reset, evicted or the server stops. Schema: sql/matches.sql.
+"""
+import threading
+import time
+
+from supabase_client import get_supabase
+
+MATCHES_TABLE = "matches"
+FLUSH_EVERY = 20
+FLUSH_SECONDS = 30
+
+
+def match_row(club, event, court, team_a, team_b, score_a, score_b, winner, started_at, ended_at):
+    """One ``matches`` row; teams are lists of names, times are datetimes (or None)."""
+    return {
+        "club": club,
+        "event": event,
+        "court": court,
+        "team_a": team_a,
+        "team_b": team_b,
+        "players": team_a + team_b,
+        "score_a": score_a,
+        "score_b": score_b,
+        "winner": winner,
+        "started_at": started_at.isoformat() if started_at else None,
+        "ended_at": ended_at.isoformat(),
+    }
+
+
+class MatchLog:
+    """Append-only buffer of match rows for one event."""
+
+    def __init__(self, flush_every=FLUSH_EVERY, flush_seconds=FLUSH_SECONDS):
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._rows = []
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def append(self, row):
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+
+    def pending(self):
+        with self._lock:
+            return list(self._rows)
+
+    def due(self):
+        with self._lock:
+            return bool(self._rows) and (
+                len(self._rows) >= self.flush_every
+                or time.monotonic() - self._oldest >= self.flush_seconds
+            )
+
+    def flush(self):
+        """Insert every buffered row in one request. Rows stay buffered if it fails."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return
+        try:
+            get_supabase().table(MATCHES_TABLE).insert(rows).execute()
+        except Exception:
+            with self._lock:
+                self._rows = rows + self._rows
+                self._oldest = time.monotonic()
+            raise
+
+
+# ======================================================
+# QUERIES
+# ======================================================
+def player_matches(name, club=None, since=None, limit=50, offset=0):
+    """
+    One page of a player's matches, newest first.
+
+    Served by the GIN index on ``players`` and the ``ended_at`` index, so only
+    the requested page is read. `since` is a datetime or ISO string.
+    """
+    query = (
+        get_supabase()
+        .table(MATCHES_TABLE)
+        .select("*")
+        .contains("players", [name])
+    )
+    if club:
+        query = query.eq("club", club)
+    if since:
+        query = query.gte("ended_at", since if isinstance(since, str) else since.isoformat())
+    return (
+        query.order("ended_at", desc=True)
+        .range(offset, offset + limit - 1)
+        .execute()
+        .data
+        or []
+    )
@@ -1,16 +1,10 @@
 import streamlit as st
-import random
-from collections import deque
-import pandas as pd
-from itertools import combinations
 import json
 import os
 from streamlit_autorefresh import st_autorefresh
-from datetime import datetime
 from supabase_client import get_supabase
-
-supabase = get_supabase()
-
+from header_image import header_photo
+from event_store import DEFAULT_CLUB, DEFAULT_EVENT, get_event, profiles_dir, store_stats, write_json
 
 # ======================================================
 # PAGE CONFIG
@@ -41,261 +35,76 @@ a[href*="github.com/streamlit"]{display:none!important;}
 # =========================
 col1, col2, col3 = st.columns([1,2,1])
 with col2:
-    st.image("TDphoto.jpg", width=300)
+    header_photo(300)
 
 st.title("🎾 Pickleball Auto Stack TiraDinks Official")
 st.caption("WE CAMED WE DINKED!")
 
+# ======================================================
+# EVENT
+# ======================================================
+# State lives in a shared engine with its own background worker, so courts
+# keep filling and results keep flushing even with every tab closed. Each
+# rerun only renders a snapshot of it. Clubs and events come from the URL
+# (?club=...&event=...) so every courtside device can bookmark its session.
+club = st.query_params.get("club", DEFAULT_CLUB)
+event_name = st.query_params.get("event", DEFAULT_EVENT)
+event = get_event(club, event_name)
+state = event.snapshot()
+
 # ======================================================
 # HELPERS
 # ======================================================
+SKILL_ICONS = {"BEGINNER":"🟢","NOVICE":"🟡","INTERMEDIATE":"🔴"}
+SUPERSCRIPT = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
+
 def icon(skill):
-    return {"BEGINNER":"🟢","NOVICE":"🟡","INTERMEDIATE":"🔴"}[skill]
+    return SKILL_ICONS[skill]
 
 def superscript_number(n):
-    sup_map = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
-    return str(n).translate(sup_map)
+    return str(n).translate(SUPERSCRIPT)
 
 def fmt(p):
     name, skill, dupr = p
-    games = st.session_state.players.get(name, {}).get("games", 0)
+    games = state["players"].get(name, {}).get("games", 0)
     return f"{icon(skill)} {superscript_number(games)} {name}"
 
-def safe_group(players):
-    skills = {p[1] for p in players}
-    return not ("BEGINNER" in skills and "INTERMEDIATE" in skills)
-
-def make_teams(players):
-    random.shuffle(players)
-    return [players[:2], players[2:]]
-
-# ======================================================
-# SESSION INIT
-# ======================================================
-def init():
-    ss = st.session_state
-    ss.setdefault("queue", deque())
-    ss.setdefault("courts", {})
-    ss.setdefault("locked", {})
-    ss.setdefault("scores", {})
-    ss.setdefault("history", [])
-    ss.setdefault("started", False)
-    ss.setdefault("court_count", 2)
-    ss.setdefault("players", {})
-    ss.setdefault("match_start_time", {})
-
-init()
-
-# ======================================================
-# DELETE PLAYER
-# ======================================================
-def delete_player(name):
-    st.session_state.queue = deque([p for p in st.session_state.queue if p[0] != name])
-    for cid, teams in st.session_state.courts.items():
-        if not teams:
-            continue
-        new_teams = []
-        for team in teams:
-            new_teams.append([p for p in team if p[0] != name])
-        if len(new_teams[0]) < 2 or len(new_teams[1]) < 2:
-            st.session_state.courts[cid] = None
-            st.session_state.locked[cid] = False
-        else:
-            st.session_state.courts[cid] = new_teams
-    st.session_state.players.pop(name, None)
-
-# ======================================================
-# MATCH ENGINE (FULL FIXED)
-# ======================================================
-def take_four_safe():
-    """
-    Find the first safe combination of 4 players 
-    while preserving first-come priority as much as possible.
-    """
-    q = list(st.session_state.queue)
-
-    if len(q) < 4:
-        return None
-
-    # Try all 4-player combinations in queue order
-    for combo in combinations(q, 4):
-        if safe_group(combo):
-            # Remove selected players from queue
-            new_queue = q.copy()
-            for p in combo:
-                new_queue.remove(p)
-            st.session_state.queue = deque(new_queue)
-            return list(combo)
-
-    return None
-
-def make_teams(players):
-    """Create two teams from 4 players, preserving first-come-first-play order."""
-    return [players[:2], players[2:]]
-
-def start_match(cid):
-    """Start a match on a court if available and not locked."""
-    if st.session_state.locked.get(cid, False):
-        return
-    players = take_four_safe()
-    if not players:
-        return
-    st.session_state.courts[cid] = make_teams(players)
-    st.session_state.locked[cid] = True
-    st.session_state.scores[cid] = [0, 0]
-    st.session_state.match_start_time[cid] = datetime.now()
-
-def finish_match(cid):
-    """Finish a match, update stats, return players to queue in FCFS order, and update Supabase."""
-    teams = st.session_state.courts.get(cid)
-    if not teams:
-        return
-
-    scoreA, scoreB = st.session_state.scores.get(cid, [0, 0])
-    teamA, teamB = teams
-
-    # Determine winners and losers
-    if scoreA > scoreB:
-        winner = "Team A"
-        winners, losers = teamA, teamB
-    elif scoreB > scoreA:
-        winner = "Team B"
-        winners, losers = teamB, teamA
-    else:
-        winner = "DRAW"
-        winners = losers = []
-
-    # ================= UPDATE PLAYER STATS IN SESSION =================
-    for p in teamA + teamB:
-        st.session_state.players[p[0]]["games"] += 1
-    for p in winners:
-        st.session_state.players[p[0]]["wins"] += 1
-    for p in losers:
-        st.session_state.players[p[0]]["losses"] += 1
-
-    # ================= SAVE GAMES & WINS TO SUPABASE =================
-    try:
-        for p in teamA + teamB:
-            name = p[0]
-            stats = st.session_state.players[name]
-            supabase.table("players").update({
-                "games": stats["games"],
-                "wins": stats["wins"]
-            }).eq("name", name).execute()
-    except Exception as e:
-        st.error(f"Supabase update failed: {e}")
-
-    # ================= RECORD MATCH HISTORY =================
-    end_time = datetime.now()
-    start_time = st.session_state.match_start_time.get(cid)
-    if start_time:
-        duration = round((end_time - start_time).total_seconds() / 60, 2)
-        start_str = start_time.strftime("%H:%M:%S")
-        end_str = end_time.strftime("%H:%M:%S")
-    else:
-        duration = 0
-        start_str = ""
-        end_str = ""
-
-    st.session_state.history.append({
-        "Court": cid,
-        "Team A": " & ".join(p[0] for p in teamA),
-        "Team B": " & ".join(p[0] for p in teamB),
-        "Score A": scoreA,
-        "Score B": scoreB,
-        "Winner": winner,
-        "Start Time": start_str,
-        "End Time": end_str,
-        "Duration (Minutes)": duration
-    })
-
-    # ================= RESET COURT =================
-    st.session_state.match_start_time.pop(cid, None)
-    st.session_state.courts[cid] = None
-    st.session_state.locked[cid] = False
-    st.session_state.scores[cid] = [0, 0]
-
-    # ================= RETURN PLAYERS TO QUEUE =================
-    st.session_state.queue.extend(teamA + teamB)
-
-def auto_fill():
-    """Automatically fill empty courts if the queue has enough players."""
-    if not st.session_state.started:
-        return
-    for cid in range(1, st.session_state.court_count + 1):
-        if st.session_state.courts.get(cid) is None:
-            start_match(cid)
-
-# ===================== WINNER WINNER BUTTON LOGIC =====================
-def winner_winner(cid):
-    """Keep winners on court and rotate losers to queue."""
-    teams = st.session_state.courts.get(cid)
-    if not teams:
-        st.warning("No players on court to apply Winner Winner")
-        return
-
-    scoreA, scoreB = st.session_state.scores.get(cid, [0, 0])
-    teamA, teamB = teams
-
-    if scoreA > scoreB:
-        winners, losers = teamA, teamB
-    elif scoreB > scoreA:
-        winners, losers = teamB, teamA
-    else:
-        st.warning("Match is a draw, cannot use Winner Winner")
-        return
-
-    # Rotate losers back to queue
-    st.session_state.queue.extend(losers)
-    # Keep winners on court
-    st.session_state.courts[cid] = [winners[:2], winners[2:]] if len(winners) > 2 else [winners, []]
-    st.session_state.scores[cid] = [0, 0]
-    st.rerun()
-
 # ======================================================
 # CSV EXPORTS
 # ======================================================
+# Passed to st.download_button as callables, so the CSV (and pandas) is only
+# built when someone actually clicks download.
 def matches_csv():
-    if not st.session_state.history:
+    import pandas as pd
+
+    history = event.snapshot()["history"]
+    if not history:
         return b""
-    return pd.DataFrame(st.session_state.history).to_csv(index=False).encode()
+    return pd.DataFrame(history).to_csv(index=False).encode()
 
 def players_csv():
+    import pandas as pd
+
+    snapshot = event.snapshot()
     rows = []
-    for name, data in st.session_state.players.items():
+    for name, data in snapshot["players"].items():
         rows.append({
             "Player Name": name,
             "DUPR ID": data["dupr"],
             "Games Played": data["games"],
             "Wins": data["wins"],
-            "Losses": data["losses"]
+            "Losses": data["losses"],
+            "Rating": snapshot["ratings"].get(name)
         })
     return pd.DataFrame(rows).to_csv(index=False).encode()
 
 # ======================================================
 # PROFILE SAVE / LOAD / DELETE
 # ======================================================
-SAVE_DIR = "profiles"
-os.makedirs(SAVE_DIR, exist_ok=True)
+SAVE_DIR = profiles_dir(club)
 
 def save_profile(name):
-    # Convert datetime objects to strings
-    match_start_time_str = {str(k): v.strftime("%Y-%m-%d %H:%M:%S") 
-                            for k, v in st.session_state.match_start_time.items()}
-
-    data = {
-        "queue": list(st.session_state.queue),
-        "courts": st.session_state.courts,
-        "locked": st.session_state.locked,
-        "scores": st.session_state.scores,
-        "history": st.session_state.history,
-        "started": st.session_state.started,
-        "court_count": st.session_state.court_count,
-        "players": st.session_state.players,
-        "match_start_time": match_start_time_str
-    }
-    with open(os.path.join(SAVE_DIR, f"{name}.json"), "w") as f:
-        json.dump(data, f)
+    write_json(os.path.join(SAVE_DIR, f"{name}.json"), event.to_dict())
     st.success(f"Profile '{name}' saved!")
 
 def load_profile(name):
@@ -305,28 +114,9 @@ def load_profile(name):
         return
     with open(path, "r") as f:
         data = json.load(f)
-
-    
-   # Convert keys back to int (VERY IMPORTANT)
-    st.session_state.courts = {int(k): v for k, v in data["courts"].items()}
-    st.session_state.locked = {int(k): v for k, v in data["locked"].items()}
-    st.session_state.scores = {int(k): v for k, v in data["scores"].items()}
-    st.session_state.queue = deque(data["queue"])
-    st.session_state.history = data["history"]
-    st.session_state.started = data["started"]
-    st.session_state.court_count = data["court_count"]
-    st.session_state.players = data["players"]
-
-    # Restore match_start_time exactly as saved
-    st.session_state.match_start_time = {}
-    for k, v in data.get("match_start_time", {}).items():
-        try:
-            st.session_state.match_start_time[int(k)] = datetime.strptime(v, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            # fallback if string parsing fails
-            st.session_state.match_start_time[int(k)] = datetime.now()
-
-
+    # Send the current event's finished matches before the profile replaces it
+    event.end_session()
+    event.load_dict(data)
 
 def delete_profile(name):
     path = os.path.join(SAVE_DIR, f"{name}.json")
@@ -337,6 +127,19 @@ def delete_profile(name):
     else:
         st.error("Profile not found!")
 
+MAX_COURTS = 64
+
+# ======================================================
+# REGISTERED PLAYERS
+# ======================================================
+# Shared by every tab and refreshed once a minute, so the 1-second refresh
+# does not query Supabase (or create the client) on each rerun
+REGISTERED_PLAYERS_TTL = 60
+
+@st.cache_data(ttl=REGISTERED_PLAYERS_TTL, show_spinner=False)
+def registered_players():
+    return get_supabase().table("players").select("*").execute().data
+
 # ======================================================
 # SIDEBAR (ORGANIZED WITH DROPDOWNS + DELETE PLAYER)
 # ======================================================
@@ -344,26 +147,38 @@ with st.sidebar:
 
     st.markdown('<h4 style="margin-bottom:10px;">⚙ Setup</h4>', unsafe_allow_html=True)
 
+    # ================== CLUB / EVENT ==================
+    with st.expander("🏷 Club & Event", expanded=False):
+        new_club = st.text_input("Club", club)
+        new_event = st.text_input("Event", event_name)
+        if st.button("Open Event") and (new_club, new_event) != (club, event_name):
+            st.query_params["club"] = new_club
+            st.query_params["event"] = new_event
+            st.rerun()
+
     # ================== COURTS ==================
     with st.expander("🏟 Courts", expanded=True):
-        st.session_state.court_count = st.selectbox(
+        court_count = st.number_input(
             "Number of Courts",
-            [2,3,4,5,6],
-            index=st.session_state.court_count-2
+            min_value=1,
+            max_value=MAX_COURTS,
+            value=state["court_count"]
         )
+        if court_count != state["court_count"]:
+            event.set_court_count(court_count)
 
    # ================== ADD PLAYER (SIDEBAR) ==================
 with st.sidebar.expander("➕ Add Player", expanded=False):
 
     # 1️⃣ Fetch all registered players from Supabase
     try:
-        registered_players = supabase.table("players").select("*").execute().data
+        players_table = registered_players()
     except Exception as e:
         st.error(f"Error fetching players from database: {e}")
-        registered_players = []
+        players_table = []
 
     # Build list of player names safely
-    player_names = [p.get("name", "") for p in registered_players if "name" in p]
+    player_names = [p.get("name", "") for p in players_table if "name" in p]
 
     # 2️⃣ Add Player Form
     with st.form("add_player_form", clear_on_submit=True):
@@ -373,11 +188,11 @@ with st.sidebar.expander("➕ Add Player", expanded=False):
         if submitted and selected_name:
 
             # Prevent duplicates
-            if selected_name in st.session_state.players:
+            if selected_name in state["players"]:
                 st.warning(f"{selected_name} is already in the queue!")
             else:
                 # Find the player data safely
-                player_data = next((p for p in registered_players if p.get("name") == selected_name), None)
+                player_data = next((p for p in players_table if p.get("name") == selected_name), None)
                 
                 if not player_data:
                     st.error("Player data not found in database!")
@@ -386,23 +201,23 @@ with st.sidebar.expander("➕ Add Player", expanded=False):
                     dupr = player_data.get("dupr", "N/A")
                     skill = player_data.get("skill", "BEGINNER").upper()
 
-                    # Add to queue and session players
-                    st.session_state.queue.append((selected_name, skill, dupr))
-                    st.session_state.players.setdefault(
-                        selected_name,
-                        {"dupr": dupr, "games":0, "wins":0, "losses":0}
-                    )
-                    st.success(f"Added player {selected_name} to queue!")
+                    # Add to queue and event players
+                    if event.add_player(selected_name, skill, dupr):
+                        # Pick up anyone who registered since the last fetch
+                        registered_players.clear()
+                        st.success(f"Added player {selected_name} to queue!")
+                    else:
+                        st.warning(f"{selected_name} is already in the queue!")
 
     # ================== DELETE PLAYER ==================
-    if st.session_state.players:
+    if state["players"]:
         with st.expander("❌ Delete Player", expanded=False):
             remove = st.selectbox(
                 "Select Player to Remove",
-                list(st.session_state.players.keys())
+                list(state["players"].keys())
             )
             if st.button("Delete Player"):
-                delete_player(remove)
+                event.delete_player(remove)
                 st.rerun()
 
     # ================== START / RESET ==================
@@ -410,26 +225,19 @@ with st.sidebar.expander("➕ Add Player", expanded=False):
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Start Games"):
-                st.session_state.started = True
-                st.session_state.courts = {
-                    i:None for i in range(1, st.session_state.court_count+1)
-                }
-                st.session_state.locked = {
-                    i:False for i in st.session_state.courts
-                }
-                st.session_state.scores = {
-                    i:[0,0] for i in st.session_state.courts
-                }
+                event.start_games()
                 st.rerun()
         with col2:
             if st.button("Reset"):
+                event.end_session()
+                event.reset()
                 st.session_state.clear()
                 st.rerun()
 
     # ================== CSV DOWNLOAD ==================
     with st.expander("📥 Export CSV", expanded=False):
-        st.download_button("Matches CSV", matches_csv(), "matches.csv")
-        st.download_button("Players CSV", players_csv(), "players.csv")
+        st.download_button("Matches CSV", matches_csv, "matches.csv")
+        st.download_button("Players CSV", players_csv, "players.csv")
 
     # ================== PROFILES ==================
     with st.expander("💾 Profiles", expanded=False):
@@ -448,23 +256,76 @@ with st.sidebar.expander("➕ Add Player", expanded=False):
         if st.button("Delete Profile") and selected_profile:
             delete_profile(selected_profile)
 
+    # ================== SERVER ==================
+    with st.expander("📊 Server Memory", expanded=False):
+        # This club's events only; other clubs' event names stay private
+        resident = store_stats(club)
+        st.caption(f"{len(resident)} events in memory, {sum(r[1] for r in resident) / 1024:.0f} KB total")
+        st.markdown("\n".join(
+            f"- **{e}**: {b / 1024:.0f} KB, idle {idle}s" for e, b, idle in resident
+        ))
+
 
 
 # ======================================================
 # MAIN
 # ======================================================
-auto_fill()
+if state["last_error"]:
+    st.error(state["last_error"])
+
+# Queue, on-deck and court markup only change when the event does, so it is
+# built once per state version (event.rendered) and shared by every tab's
+# 1-second refresh instead of being re-joined on each rerun.
+version = state["version"]
 
 st.subheader("⏳ Waiting Queue")
-if st.session_state.queue:
+if state["queue"]:
     st.markdown(
-        f'<div class="waiting-box">{", ".join(fmt(p) for p in st.session_state.queue)}</div>',
+        event.rendered("queue", version, lambda: (
+            f'<div class="waiting-box">{", ".join(fmt(p) for p in state["queue"])}</div>'
+        )),
         unsafe_allow_html=True
     )
 else:
     st.success("No players waiting 🎉")
 
-if not st.session_state.started:
+if state["on_deck"]:
+    st.subheader("🔜 On Deck")
+    st.markdown(
+        event.rendered("on_deck", version, lambda: (
+            '<div class="waiting-box">' + "<br>".join(
+                f"<b>{n}.</b> " + ", ".join(fmt(p) for p in four)
+                for n, four in enumerate(state["on_deck"], start=1)
+            ) + '</div>'
+        )),
+        unsafe_allow_html=True
+    )
+
+# ======================================================
+# PAIRING HEATMAP (how often players partnered / faced each other)
+# ======================================================
+if st.toggle("🤝 Show pairing heatmap"):
+    import altair as alt
+    import pandas as pd
+
+    kind = st.radio("Count", ["partner", "opponent"], horizontal=True)
+    names, counts = event.pair_matrix(kind)
+    if not names:
+        st.info("No players yet.")
+    else:
+        heat = pd.DataFrame(counts, index=names, columns=names).stack().reset_index()
+        heat.columns = ["Player", "With", "Matches"]
+        st.altair_chart(
+            alt.Chart(heat).mark_rect().encode(
+                x=alt.X("Player:N", sort=names),
+                y=alt.Y("With:N", sort=names),
+                color=alt.Color("Matches:Q", scale=alt.Scale(scheme="oranges")),
+                tooltip=["Player", "With", "Matches"]
+            ),
+            use_container_width=True
+        )
+
+if not state["started"]:
     st.stop()
     st_autorefresh(interval=1000, key="live_timer")
 
@@ -504,91 +365,145 @@ st.markdown("""
     padding:4px 6px !important;
 }
 
+.court-grid {
+    display:grid;
+    grid-template-columns:repeat(auto-fill, minmax(170px, 1fr));
+    gap:8px;
+    margin-bottom:12px;
+}
+
+.court-tile {
+    padding:8px;
+    border-radius:8px;
+    font-size:13px;
+    line-height:1.35;
+}
+.court-tile.busy {background:#f4f6fa;}
+.court-tile.free {background:#e8f5e9;}
+.tile-clock {float:right;}
+.tile-idle {color:#666;}
+
 </style>
 """, unsafe_allow_html=True)
 
-cols = st.columns(2)
-
-for i, cid in enumerate(st.session_state.courts):
-    with cols[i % 2]:
-        st.markdown('<div class="court-card">', unsafe_allow_html=True)
-        st.markdown(f'<div class="court-info"><b>Court {cid}</b></div>', unsafe_allow_html=True)
-
-        # ⏱ Live Timer
-        start_time = st.session_state.match_start_time.get(cid)
-        if start_time:
-            elapsed_seconds = int((datetime.now() - start_time).total_seconds())
-            minutes = elapsed_seconds // 60
-            seconds = elapsed_seconds % 60
-            st.markdown(f'<div class="court-info">⏱ {minutes:02d}:{seconds:02d}</div>', unsafe_allow_html=True)
-
-        teams = st.session_state.courts[cid]
-
-        # -------------------------
-        # EMPTY COURT
-        # -------------------------
-        if not teams:
-            st.info("Waiting for safe players...")
-            st.markdown('</div>', unsafe_allow_html=True)
-            continue
-
-        # -------------------------
-        # SHOW TEAMS
-        # -------------------------
-        st.markdown('<div class="court-info"><b>Team A</b><br>' + "<br>".join(fmt(p) for p in teams[0]) + '</div>', unsafe_allow_html=True)
-        st.markdown('<div class="court-info"><b>Team B</b><br>' + "<br>".join(fmt(p) for p in teams[1]) + '</div>', unsafe_allow_html=True)
-
-        # -------------------------
-        # COLLAPSIBLE CONTROLS: SCORE & BUTTONS
-        # -------------------------
-        with st.expander("🎯 Score & Controls", expanded=False):
-            st.markdown('<div class="control-btn">', unsafe_allow_html=True)
-            c1, c2 = st.columns(2)
-            if c1.button("🔀 Shuffle Teams", key=f"shuffle_{cid}"):
-                players = teams[0] + teams[1]
-                random.shuffle(players)
-                st.session_state.courts[cid] = [players[:2], players[2:]]
-                st.rerun()
+# ======================================================
+# COURT GRID: one markup block for every court, widgets only for the
+# selected one, so rerun cost stays flat at 40+ courts. Tiles show when the
+# match started rather than a ticking clock, so the grid only changes with
+# the state version or an overtime flag; the live clock is on the card below.
+# ======================================================
+def clock(cid):
+    elapsed_seconds = state["elapsed"].get(cid)
+    if elapsed_seconds is None:
+        return ""
+    minutes = elapsed_seconds // 60
+    seconds = elapsed_seconds % 60
+    overtime = " ⚠️" if cid in state["overtime"] else ""
+    return f"⏱ {minutes:02d}:{seconds:02d}{overtime}"
+
+def tile_clock(cid):
+    started_at = state["started_at"].get(cid)
+    if started_at is None:
+        return ""
+    overtime = " ⚠️" if cid in state["overtime"] else ""
+    return f"⏱ {started_at}{overtime}"
+
+def court_tile(cid):
+    teams = state["courts"][cid]
+    if not teams:
+        body = '<span class="tile-idle">Waiting for safe players...</span>'
+    else:
+        body = (" & ".join(p[0] for p in teams[0]) + "<br><i>vs</i><br>"
+                + " & ".join(p[0] for p in teams[1]))
+    busy = "busy" if teams else "free"
+    return (f'<div class="court-tile {busy}"><b>Court {cid}</b> '
+            f'<span class="tile-clock">{tile_clock(cid)}</span><br>{body}</div>')
+
+st.markdown(
+    event.rendered("court_grid", (version, frozenset(state["overtime"])), lambda: (
+        '<div class="court-grid">' + "".join(court_tile(cid) for cid in state["courts"]) + '</div>'
+    )),
+    unsafe_allow_html=True
+)
+
+cid = st.selectbox(
+    "🎯 Manage Court",
+    list(state["courts"]),
+    format_func=lambda c: f"Court {c}" + ("" if state["courts"][c] else " (free)"),
+    key="selected_court"
+)
+
+if cid is not None:
+    st.markdown('<div class="court-card">', unsafe_allow_html=True)
+    st.markdown(f'<div class="court-info"><b>Court {cid}</b></div>', unsafe_allow_html=True)
+
+    # ⏱ Live Timer
+    if clock(cid):
+        st.markdown(f'<div class="court-info">{clock(cid)}</div>', unsafe_allow_html=True)
+
+    teams = state["courts"][cid]
+
+    # -------------------------
+    # EMPTY COURT
+    # -------------------------
+    if not teams:
+        st.info("Waiting for safe players...")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.stop()
+
+    # -------------------------
+    # SHOW TEAMS
+    # -------------------------
+    team_a, team_b = event.rendered(("court", cid), version, lambda: tuple(
+        f'<div class="court-info"><b>{label}</b><br>' + "<br>".join(fmt(p) for p in team) + '</div>'
+        for label, team in (("Team A", teams[0]), ("Team B", teams[1]))
+    ))
+    st.markdown(team_a, unsafe_allow_html=True)
+    st.markdown(team_b, unsafe_allow_html=True)
+
+    # -------------------------
+    # SCORE & BUTTONS
+    # -------------------------
+    st.markdown('<div class="control-btn">', unsafe_allow_html=True)
+    c1, c2 = st.columns(2)
+    if c1.button("🔀 Shuffle Teams", key=f"shuffle_{cid}"):
+        event.shuffle_teams(cid)
+        st.rerun()
 
-            if c2.button("🔁 Rematch", key=f"rematch_{cid}"):
-                st.session_state.scores[cid] = [0, 0]
-                st.rerun()
+    if c2.button("🔁 Rematch", key=f"rematch_{cid}"):
+        event.rematch(cid)
+        st.rerun()
 
-            a = st.number_input("Score A", 0, key=f"A_{cid}")
-            b = st.number_input("Score B", 0, key=f"B_{cid}")
+    a = st.number_input("Score A", 0, key=f"A_{cid}")
+    b = st.number_input("Score B", 0, key=f"B_{cid}")
 
-            if st.button("✅ Submit Score", key=f"submit_{cid}"):
-                st.session_state.scores[cid] = [a, b]
-                finish_match(cid)
+    if st.button("✅ Submit Score", key=f"submit_{cid}"):
+        event.finish_match(cid, a, b)
+        st.rerun()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -------------------------
+    # COLLAPSIBLE SWAP PLAYER
+    # -------------------------
+    with st.expander("🔁 Swap Player", expanded=False):
+        flat_court = teams[0] + teams[1]
+        queue_list = state["queue"]
+
+        if flat_court and queue_list:
+            swap_from_court = st.selectbox(
+                "Player OUT (from court)",
+                [p[0] for p in flat_court],
+                key=f"swap_out_{cid}"
+            )
+
+            swap_from_queue = st.selectbox(
+                "Player IN (from waiting)",
+                [p[0] for p in queue_list],
+                key=f"swap_in_{cid}"
+            )
+
+            if st.button("🔄 Swap Players", key=f"swap_btn_{cid}"):
+                event.swap_players(cid, swap_from_court, swap_from_queue)
                 st.rerun()
-            st.markdown('</div>', unsafe_allow_html=True)
-
-        # -------------------------
-        # COLLAPSIBLE SWAP PLAYER
-        # -------------------------
-        with st.expander("🔁 Swap Player", expanded=False):
-            flat_court = teams[0] + teams[1]
-            queue_list = list(st.session_state.queue)
-
-            if flat_court and queue_list:
-                swap_from_court = st.selectbox(
-                    "Player OUT (from court)",
-                    [p[0] for p in flat_court],
-                    key=f"swap_out_{cid}"
-                )
-
-                swap_from_queue = st.selectbox(
-                    "Player IN (from waiting)",
-                    [p[0] for p in queue_list],
-                    key=f"swap_in_{cid}"
-                )
-
-                if st.button("🔄 Swap Players", key=f"swap_btn_{cid}"):
-                    court_index = next(i for i, p in enumerate(flat_court) if p[0] == swap_from_court)
-                    queue_index = next(i for i, p in enumerate(queue_list) if p[0] == swap_from_queue)
-                    flat_court[court_index], queue_list[queue_index] = queue_list[queue_index], flat_court[court_index]
-                    st.session_state.courts[cid] = [flat_court[:2], flat_court[2:]]
-                    st.session_state.queue = deque(queue_list)
-                    st.rerun()
 
-        st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
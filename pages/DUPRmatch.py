@@ -1,9 +1,18 @@
 import streamlit as st
-import pandas as pd
-import random
-from collections import defaultdict
+import time
 from io import BytesIO
-import math
+from dupr_schedule import (
+    balanced_courts, court_assignments, court_spread, generate_schedule, repair_schedule, split_courts
+)
+
+# Club Elo points worth one DUPR point when nudging uploaded ratings
+ELO_PER_DUPR_POINT = 400
+
+# (players, courts, rating column) -> courts_players
+SPLIT_METHODS = {
+    "Balanced by rating": lambda players, courts, key: balanced_courts(players, courts, key=key),
+    "Even slices": lambda players, courts, key: split_courts(players, courts),
+}
 
 # ============================
 # PAGE CONFIG
@@ -12,6 +21,19 @@ st.set_page_config(page_title="DUPR Fair Match Generator", layout="wide")
 st.title("🏆 DUPR Fair Match Generator")
 st.write("Upload Excel file with columns: Name, DUPR_ID, Rating")
 
+# Event store and ratings only load when club ratings are switched on
+def club_rating_book():
+    """Club Elo from every stored Auto Stack match, recomputed in one pass."""
+    from event_store import DEFAULT_CLUB, club_history
+    from ratings import matches_from_history, rate_matches
+
+    return rate_matches(matches_from_history(club_history(st.query_params.get("club", DEFAULT_CLUB))))
+
+def split_rating(rating, club_elo):
+    from ratings import BASE_RATING
+
+    return rating + (club_elo - BASE_RATING) / ELO_PER_DUPR_POINT
+
 # ============================
 # FILE UPLOADER
 # ============================
@@ -22,11 +44,25 @@ uploaded_file = st.file_uploader("Upload Players Excel File", type=["xlsx", "csv
 # ============================
 NUM_MATCHES = st.number_input("Number of Matches", min_value=1, max_value=50, value=5)
 NUM_COURTS = st.number_input("Number of Courts", min_value=1, max_value=10, value=4)
+USE_CLUB_RATINGS = st.checkbox(
+    "Adjust ratings with club Auto Stack results",
+    help="Players with club match history are nudged up or down by their club Elo before courts are split."
+)
+SPLIT_METHOD = st.radio(
+    "Court split",
+    list(SPLIT_METHODS),
+    horizontal=True,
+    help="Balanced groups players by rating gaps with 4+ per court (fewer courts if needed); "
+         "even slices cut the sorted list into equal chunks."
+)
+COMPARE_SPLITS = st.checkbox("Compare rating spread per court for both splits")
 
 # ============================
 # GENERATE MATCHES
 # ============================
 if uploaded_file is not None:
+    # pandas (and openpyxl behind read_excel/to_excel) only load once a file is uploaded
+    import pandas as pd
 
     # Read file
     if uploaded_file.name.endswith(".csv"):
@@ -43,118 +79,134 @@ if uploaded_file is not None:
 
     if st.button("🚀 Generate Matches", use_container_width=True):
 
+        sort_column = "Rating"
+        if USE_CLUB_RATINGS:
+            book = club_rating_book()
+            df["Club Elo"] = df["Name"].map(lambda n: round(book.get(n)))
+            df["Split Rating"] = split_rating(df["Rating"], df["Club Elo"])
+            sort_column = "Split Rating"
+
         # Sort players by rating (HIGH to LOW)
-        df = df.sort_values(by="Rating", ascending=False).reset_index(drop=True)
-
-        total_players = len(df)
-        players_per_court = math.ceil(total_players / NUM_COURTS)
-
-        matches_output = []
-        court_assignments_output = []
-
-        # ============================
-        # SPLIT PLAYERS EVENLY BY SKILL
-        # ============================
-        courts_players = []
-
-        for i in range(NUM_COURTS):
-            start = i * players_per_court
-            end = start + players_per_court
-            court_group = df.iloc[start:end].to_dict("records")
-            courts_players.append(court_group)
-
-        # ============================
-        # SAVE COURT ASSIGNMENTS
-        # ============================
-        for court_number, court_players in enumerate(courts_players, start=1):
-            for p in court_players:
-                court_assignments_output.append({
-                    "Court": court_number,
-                    "Player Name": p["Name"],
-                    "DUPR_ID": p["DUPR_ID"],
-                    "Rating": p["Rating"]
-                })
-
-        # ============================
-        # GENERATE MATCHES
-        # ============================
-        for court_number, court_players in enumerate(courts_players, start=1):
-
-            if len(court_players) < 4:
-                continue
-
-            partner_history = defaultdict(set)
-
-            for match_number in range(1, NUM_MATCHES + 1):
-
-                random.shuffle(court_players)
-
-                group = court_players[:4]
-
-                # Balanced pairing (strongest + weakest)
-                group_sorted = sorted(group, key=lambda x: x["Rating"])
-                team_a = [group_sorted[0], group_sorted[-1]]
-                team_b = [group_sorted[1], group_sorted[2]]
-
-                # Avoid repeat partners
-                def repeated(team):
-                    return team[1]["Name"] in partner_history[team[0]["Name"]]
-
-                if repeated(team_a) or repeated(team_b):
-                    random.shuffle(group_sorted)
-                    team_a = group_sorted[:2]
-                    team_b = group_sorted[2:4]
-
-                # Update partner history
-                partner_history[team_a[0]["Name"]].add(team_a[1]["Name"])
-                partner_history[team_a[1]["Name"]].add(team_a[0]["Name"])
-                partner_history[team_b[0]["Name"]].add(team_b[1]["Name"])
-                partner_history[team_b[1]["Name"]].add(team_b[0]["Name"])
-
-                matches_output.append({
-                    "Court": court_number,
-                    "Match": match_number,
-                    "Team A Player 1": team_a[0]["Name"],
-                    "Team A Player 2": team_a[1]["Name"],
-                    "Team A Avg Rating": round((team_a[0]["Rating"] + team_a[1]["Rating"]) / 2, 3),
-                    "Team B Player 1": team_b[0]["Name"],
-                    "Team B Player 2": team_b[1]["Name"],
-                    "Team B Avg Rating": round((team_b[0]["Rating"] + team_b[1]["Rating"]) / 2, 3),
-                })
-
-        # ============================
-        # DISPLAY RESULTS
-        # ============================
-        if matches_output:
-
-            matches_df = pd.DataFrame(matches_output)
-            st.success("✅ Matches Generated Successfully!")
-            st.dataframe(matches_df, use_container_width=True)
-
-            # Download Matches Excel
-            output_matches = BytesIO()
-            matches_df.to_excel(output_matches, index=False, engine="openpyxl")
-            output_matches.seek(0)
-
-            st.download_button(
-                label="📥 Download Match Schedule",
-                data=output_matches,
-                file_name="DUPR_Match_Schedule.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+        df = df.sort_values(by=sort_column, ascending=False).reset_index(drop=True)
+
+        players = df.to_dict("records")
+        courts_players = SPLIT_METHODS[SPLIT_METHOD](players, NUM_COURTS, sort_column)
+        st.session_state.dupr_schedule = {
+            "matches": generate_schedule(courts_players, NUM_MATCHES),
+            "courts": courts_players,
+            "num_matches": NUM_MATCHES,
+            "extra_columns": ["Club Elo"] if USE_CLUB_RATINGS else [],
+            "rating_key": sort_column,
+            "spread": {
+                method: court_spread(split(players, NUM_COURTS, sort_column), sort_column)
+                for method, split in SPLIT_METHODS.items()
+            } if COMPARE_SPLITS else None,
+        }
+        if len(courts_players) < NUM_COURTS:
+            st.info(f"Using {len(courts_players)} court(s) so every court has at least 4 players.")
+        st.success("✅ Matches Generated Successfully!")
 
-            # Download Court Assignment Excel
-            court_df = pd.DataFrame(court_assignments_output)
-            output_courts = BytesIO()
-            court_df.to_excel(output_courts, index=False, engine="openpyxl")
-            output_courts.seek(0)
-
-            st.download_button(
-                label="📥 Download Court Assignments",
-                data=output_courts,
-                file_name="DUPR_Court_Assignments.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+# ============================
+# DISPLAY RESULTS
+# ============================
+schedule = st.session_state.get("dupr_schedule")
+
+if schedule and not schedule["matches"]:
+    st.warning("Not enough players to generate matches.")
+
+elif schedule:
+    import pandas as pd
+
+    matches_df = pd.DataFrame(schedule["matches"])
+    st.dataframe(matches_df, use_container_width=True)
+
+    if schedule.get("spread"):
+        with st.expander("📊 Rating spread per court", expanded=True):
+            for col, (method, rows) in zip(st.columns(len(schedule["spread"])), schedule["spread"].items()):
+                with col:
+                    playable = [r for r in rows if r["Playable"]]
+                    st.markdown(f"**{method}**")
+                    st.caption(
+                        f"{len(playable)}/{len(rows)} courts playable, mean spread "
+                        f"{sum(r['Spread'] for r in playable) / max(len(playable), 1):.3f}"
+                    )
+                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+    def excel_bytes(rows):
+        output = BytesIO()
+        pd.DataFrame(rows).to_excel(output, index=False, engine="openpyxl")
+        output.seek(0)
+        return output
+
+    # Workbooks are only written when a download is clicked
+    st.download_button(
+        label="📥 Download Match Schedule",
+        data=lambda: excel_bytes(schedule["matches"]),
+        file_name="DUPR_Match_Schedule.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+    st.download_button(
+        label="📥 Download Court Assignments",
+        data=lambda: excel_bytes(court_assignments(schedule["courts"], schedule["extra_columns"])),
+        file_name="DUPR_Court_Assignments.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+    # ============================
+    # REPAIR AFTER ROSTER CHANGES
+    # ============================
+    with st.expander("🩹 Repair Schedule (withdrawals / late arrivals)", expanded=False):
+        st.caption(
+            "Matches up to the number below stay exactly as announced; only courts "
+            "that lose or gain a player get their remaining matches regenerated."
+        )
+        fixed_through = st.number_input(
+            "Matches already played or announced",
+            min_value=0,
+            max_value=schedule["num_matches"],
+            value=0
+        )
+        withdrawn = st.multiselect(
+            "Withdrawn players",
+            sorted(p["Name"] for court in schedule["courts"] for p in court)
+        )
+        arrivals_text = st.text_area("Late arrivals (one per line: Name, DUPR_ID, Rating)")
+
+        if st.button("🩹 Repair Schedule"):
+            arrivals = []
+            for line in arrivals_text.splitlines():
+                if not line.strip():
+                    continue
+                parts = [x.strip() for x in line.split(",")]
+                try:
+                    arrivals.append({"Name": parts[0], "DUPR_ID": parts[1], "Rating": float(parts[2])})
+                except (IndexError, ValueError):
+                    st.error(f"Could not read arrival: {line}")
+                    st.stop()
+
+            # Arrivals need the same columns as the uploaded players
+            if arrivals and "Club Elo" in schedule["extra_columns"]:
+                book = club_rating_book()
+                for p in arrivals:
+                    p["Club Elo"] = round(book.get(p["Name"]))
+                    p["Split Rating"] = split_rating(p["Rating"], p["Club Elo"])
+
+            start = time.perf_counter()
+            matches, courts, affected = repair_schedule(
+                schedule["matches"], schedule["courts"], schedule["num_matches"],
+                fixed_through, withdrawn, arrivals, key=schedule.get("rating_key", "Rating")
             )
-
-        else:
-            st.warning("Not enough players to generate matches.")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            schedule.update(matches=matches, courts=courts)
+
+            short = [c for c in affected if len(courts[c - 1]) < 4]
+            if short:
+                st.session_state.dupr_notice = ("warning", f"Court(s) {short} have fewer than 4 players; their remaining matches were dropped.")
+            else:
+                st.session_state.dupr_notice = ("success", f"Repaired court(s) {affected or 'none'} in {elapsed_ms:.1f} ms.")
+            st.rerun()
+
+    notice = st.session_state.pop("dupr_notice", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
@@ -1,12 +1,6 @@
 # player_profile.py
 import streamlit as st
 from supabase_client import get_supabase
-import pandas as pd
-
-# ==========================
-# INIT
-# ==========================
-supabase = get_supabase()
 
 st.set_page_config(page_title="🎾 Player Profiles", layout="centered")
 st.title("🎾 Player Profiles - TiraDinks Official")
@@ -15,7 +9,7 @@ st.title("🎾 Player Profiles - TiraDinks Official")
 # LOAD PLAYERS (used for display + delete dropdown)
 # =====================================================
 try:
-    response = supabase.table("players").select("*").order("created_at").execute()
+    response = get_supabase().table("players").select("*").order("created_at").execute()
     players = response.data or []
 except Exception as e:
     st.error(f"Error loading players: {e}")
@@ -42,7 +36,7 @@ with st.sidebar.form("add_player_form", clear_on_submit=True):
             st.sidebar.error("Please provide both Name and DUPR ID")
         else:
             try:
-                response = supabase.table("players").insert({
+                response = get_supabase().table("players").insert({
                     "name": name.strip(),
                     "dupr": dupr.strip(),
                     "skill": skill
@@ -78,7 +72,7 @@ if players:
 
             if selected_player:
                 delete_response = (
-                    supabase
+                    get_supabase()
                     .table("players")
                     .delete()
                     .eq("id", selected_player["id"])
@@ -104,6 +98,8 @@ st.subheader("📋 Registered Players")
 if not players:
     st.info("No players registered yet.")
 else:
+    import pandas as pd
+
     df = pd.DataFrame(players)
 
     # Ensure skill column exists
@@ -125,3 +121,46 @@ else:
         use_container_width=True,
         hide_index=True
     )
+
+# =====================================================
+# MAIN PAGE - MATCH HISTORY (one page at a time from the matches table)
+# =====================================================
+st.subheader("📜 Match History")
+
+HISTORY_PAGE_SIZE = 20
+
+history_name = st.selectbox("Player", [""] + sorted(p["name"] for p in players))
+if history_name:
+    from match_log import player_matches
+
+    page = st.number_input("Page", min_value=1, value=1)
+    try:
+        rows = player_matches(
+            history_name,
+            limit=HISTORY_PAGE_SIZE,
+            offset=(page - 1) * HISTORY_PAGE_SIZE
+        )
+    except Exception as e:
+        st.error(f"Error loading matches: {e}")
+        rows = []
+
+    if not rows:
+        st.info("No matches found.")
+    else:
+        import pandas as pd
+
+        history_df = pd.DataFrame(rows)
+        history_df["Team A"] = history_df["team_a"].str.join(" & ")
+        history_df["Team B"] = history_df["team_b"].str.join(" & ")
+        st.dataframe(
+            history_df[["ended_at", "event", "court", "Team A", "Team B", "score_a", "score_b", "winner"]].rename(columns={
+                "ended_at": "Played",
+                "event": "Event",
+                "court": "Court",
+                "score_a": "Score A",
+                "score_b": "Score B",
+                "winner": "Winner"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
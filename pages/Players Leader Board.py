@@ -1,9 +1,6 @@
 import streamlit as st
-import pandas as pd
 from supabase_client import get_supabase
 
-supabase = get_supabase()
-
 # ================== PAGE CONFIG ==================
 st.set_page_config(page_title="TiraDinks Leaderboard", page_icon="🏆", layout="wide")
 st.title("🏆 TiraDinks Leaderboard")
@@ -12,8 +9,10 @@ st.caption("Rankings based on total wins and win rate")
 # ================== GET PLAYER DATA ==================
 def get_players_data():
     """Fetch players from Supabase."""
+    import pandas as pd
+
     try:
-        response = supabase.table("players").select("*").execute()
+        response = get_supabase().table("players").select("*").execute()
         if response.data:
             df = pd.DataFrame(response.data)
             # Calculate win rate
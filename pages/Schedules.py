@@ -1 +1,95 @@
+import streamlit as st
+import time
+from datetime import datetime, time as clock_time
+from io import BytesIO
+from fixtures import FORMATS, assign_slots, build_fixtures
 
+# ============================
+# PAGE CONFIG
+# ============================
+st.set_page_config(page_title="League & Tournament Schedules", page_icon="📅", layout="wide")
+st.title("📅 League & Tournament Schedules")
+st.caption("Round robin, pool play and elimination brackets across your courts")
+
+# ============================
+# CONFIG INPUTS
+# ============================
+FORMAT = st.selectbox("Format", FORMATS)
+teams_text = st.text_area(
+    "Teams (one per line, in seed order)",
+    help="Leave empty to use numbered teams."
+)
+c1, c2, c3, c4 = st.columns(4)
+NUM_TEAMS = c1.number_input("Number of Teams", min_value=2, max_value=256, value=8, disabled=bool(teams_text.strip()))
+NUM_COURTS = c2.number_input("Number of Courts", min_value=1, max_value=64, value=4)
+SLOT_MINUTES = c3.number_input("Minutes per Match", min_value=5, max_value=180, value=20, step=5)
+START_TIME = c4.time_input("Start Time", clock_time(8, 0))
+NUM_POOLS = 2
+if FORMAT == "Pool Play":
+    NUM_POOLS = st.number_input("Number of Pools", min_value=1, max_value=32, value=2)
+
+teams = [t.strip() for t in teams_text.splitlines() if t.strip()]
+if not teams:
+    teams = [f"Team {i}" for i in range(1, NUM_TEAMS + 1)]
+
+if len(set(teams)) != len(teams):
+    st.error("Team names must be unique.")
+    st.stop()
+
+# ============================
+# GENERATE (cached per configuration)
+# ============================
+@st.cache_data(show_spinner=False, max_entries=32)
+def schedule_rows(fmt, teams, num_pools, num_courts, start_time, slot_minutes):
+    start = time.perf_counter()
+    rows = assign_slots(
+        build_fixtures(fmt, teams, num_pools),
+        num_courts,
+        datetime.combine(datetime.today(), start_time),
+        slot_minutes
+    )
+    return rows, (time.perf_counter() - start) * 1000
+
+rows, build_ms = schedule_rows(FORMAT, tuple(teams), NUM_POOLS, NUM_COURTS, START_TIME, SLOT_MINUTES)
+
+if not rows:
+    st.warning("Not enough teams to schedule any matches.")
+    st.stop()
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Matches", len(rows))
+c2.metric("Time Slots", rows[-1]["Slot"])
+last = rows[-1]
+c3.metric("Last Match Starts", last["Time"] if last["Day"] == 1 else f"Day {last['Day']}, {last['Time']}")
+st.caption(f"{len(teams)} teams, built in {build_ms:.1f} ms")
+
+st.dataframe(rows, use_container_width=True, hide_index=True)
+
+# ============================
+# EXPORT
+# ============================
+# Files are only written when a download is clicked
+def csv_bytes():
+    import pandas as pd
+
+    return pd.DataFrame(rows).to_csv(index=False).encode()
+
+def excel_bytes():
+    import pandas as pd
+
+    output = BytesIO()
+    pd.DataFrame(rows).to_excel(output, index=False, engine="openpyxl")
+    output.seek(0)
+    return output
+
+file_stem = FORMAT.replace(" ", "_") + "_Schedule"
+c1, c2 = st.columns(2)
+with c1:
+    st.download_button("📥 Download CSV", csv_bytes, f"{file_stem}.csv", mime="text/csv")
+with c2:
+    st.download_button(
+        "📥 Download Excel",
+        excel_bytes,
+        f"{file_stem}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
@@ -0,0 +1,105 @@
+"""Partner/opponent co-occurrence index used to avoid repeat pairings.
+
+Players get an integer row the first time they are seen; two square count
+matrices (partners, opponents) are updated in place after every finished
+match, so picking the least-repeated split of a foursome is three lookups
+rather than a scan of the match history.
+"""
+from itertools import combinations
+
+import numpy as np
+
+# The three ways to split 4 players into two teams, as index pairs.
+# The first one keeps queue order (1st+2nd vs 3rd+4th), so it wins ties.
+SPLITS = (
+    ((0, 1), (2, 3)),
+    ((0, 2), (1, 3)),
+    ((0, 3), (1, 2)),
+)
+
+# A repeated partner costs more than facing someone again
+PARTNER_WEIGHT = 2
+OPPONENT_WEIGHT = 1
+
+
+class CoOccurrence:
+    """Symmetric partner and opponent counts, grown by doubling as players arrive."""
+
+    def __init__(self, capacity=32):
+        self.index = {}
+        self.names = []
+        self.partner = np.zeros((capacity, capacity), dtype=np.int32)
+        self.opponent = np.zeros((capacity, capacity), dtype=np.int32)
+
+    def _row(self, name):
+        row = self.index.get(name)
+        if row is not None:
+            return row
+        row = len(self.names)
+        if row == len(self.partner):
+            size = 2 * len(self.partner)
+            for attr in ("partner", "opponent"):
+                old = getattr(self, attr)
+                grown = np.zeros((size, size), dtype=old.dtype)
+                grown[:row, :row] = old
+                setattr(self, attr, grown)
+        self.index[name] = row
+        self.names.append(name)
+        return row
+
+    def record(self, team_a, team_b):
+        """Count one finished match; teams are lists of player names."""
+        a = [self._row(n) for n in team_a]
+        b = [self._row(n) for n in team_b]
+        for team in (a, b):
+            for i, j in combinations(team, 2):
+                self.partner[i, j] += 1
+                self.partner[j, i] += 1
+        if a and b:
+            self.opponent[np.ix_(a, b)] += 1
+            self.opponent[np.ix_(b, a)] += 1
+
+    def split_cost(self, rows, split):
+        (a0, a1), (b0, b1) = split
+        p, o = self.partner, self.opponent
+        partners = p[rows[a0], rows[a1]] + p[rows[b0], rows[b1]]
+        opponents = (o[rows[a0], rows[b0]] + o[rows[a0], rows[b1]]
+                     + o[rows[a1], rows[b0]] + o[rows[a1], rows[b1]])
+        return PARTNER_WEIGHT * int(partners) + OPPONENT_WEIGHT * int(opponents)
+
+    def best_teams(self, players, ratings=None):
+        """
+        Split 4 (name, ...) players into the least-repeated two teams.
+
+        With a RatingBook, equally-repeated splits are broken by the gap
+        between the two teams' average ratings.
+        """
+        rows = [self._row(p[0]) for p in players]
+
+        def gap(split):
+            if ratings is None:
+                return 0
+            (a0, a1), (b0, b1) = split
+            team_a = ratings.get(players[a0][0]) + ratings.get(players[a1][0])
+            team_b = ratings.get(players[b0][0]) + ratings.get(players[b1][0])
+            return abs(team_a - team_b)
+
+        split = min(SPLITS, key=lambda s: (self.split_cost(rows, s), gap(s)))
+        (a0, a1), (b0, b1) = split
+        return [[players[a0], players[a1]], [players[b0], players[b1]]]
+
+    def matrix(self, kind="partner"):
+        """(names, counts) for the players seen so far; counts is a copy."""
+        n = len(self.names)
+        counts = self.partner if kind == "partner" else self.opponent
+        return list(self.names), counts[:n, :n].copy()
+
+    @classmethod
+    def from_history(cls, history):
+        """Rebuild from AutoStack history rows ("Team A": "x & y", ...)."""
+        index = cls()
+        for row in history:
+            team_a = [n for n in row["Team A"].split(" & ") if n]
+            team_b = [n for n in row["Team B"].split(" & ") if n]
+            index.record(team_a, team_b)
+        return index
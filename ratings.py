@@ -0,0 +1,132 @@
+"""Doubles Elo ratings from match history.
+
+A team's strength is the mean of its two players' ratings; every player on
+a team moves by their own K times (actual - expected). New players use a
+larger K until they have PROVISIONAL_GAMES behind them.
+
+``rate_matches`` recomputes everyone from the full history with NumPy.
+Matches are grouped into layers where no player appears twice (a match
+goes one layer after the latest layer of any of its players), so each layer
+is a single vectorized update and the result is identical to replaying the
+matches one by one. ``RatingBook.update`` is that same step for one match,
+applied as results come in.
+"""
+import numpy as np
+
+BASE_RATING = 1500.0
+K_PROVISIONAL = 48.0
+K_ESTABLISHED = 24.0
+PROVISIONAL_GAMES = 10
+
+
+def expected(team_rating, opp_rating):
+    return 1.0 / (1.0 + 10.0 ** ((opp_rating - team_rating) / 400.0))
+
+def outcome(score_a, score_b):
+    """1 / 0.5 / 0 from team A's point of view (vectorizes over arrays)."""
+    return np.sign(np.asarray(score_a, dtype=float) - np.asarray(score_b, dtype=float)) * 0.5 + 0.5
+
+def k_factor(games):
+    return np.where(np.asarray(games) < PROVISIONAL_GAMES, K_PROVISIONAL, K_ESTABLISHED)
+
+
+class RatingBook:
+    """Ratings and games played per player, indexed by name."""
+
+    def __init__(self, capacity=32):
+        self.index = {}
+        self.names = []
+        self.rating = np.full(capacity, BASE_RATING)
+        self.games = np.zeros(capacity, dtype=np.int32)
+
+    def _row(self, name):
+        row = self.index.get(name)
+        if row is not None:
+            return row
+        row = len(self.names)
+        if row == len(self.rating):
+            self.rating = np.concatenate([self.rating, np.full(row, BASE_RATING)])
+            self.games = np.concatenate([self.games, np.zeros(row, dtype=np.int32)])
+        self.index[name] = row
+        self.names.append(name)
+        return row
+
+    def get(self, name):
+        row = self.index.get(name)
+        return BASE_RATING if row is None else float(self.rating[row])
+
+    def team_rating(self, names):
+        return sum(self.get(n) for n in names) / len(names) if names else BASE_RATING
+
+    def update(self, team_a, team_b, score_a, score_b):
+        """Apply one finished doubles match (lists of two names each)."""
+        if len(team_a) != 2 or len(team_b) != 2:
+            return
+        a = [self._row(n) for n in team_a]
+        b = [self._row(n) for n in team_b]
+        e = expected(self.rating[a].mean(), self.rating[b].mean())
+        s = float(outcome(score_a, score_b))
+        self.rating[a] += k_factor(self.games[a]) * (s - e)
+        self.rating[b] += k_factor(self.games[b]) * (e - s)
+        self.games[a + b] += 1
+
+    def table(self):
+        """[(name, rating, games)] sorted by rating, highest first."""
+        rows = [(n, round(float(self.rating[i]), 1), int(self.games[i])) for n, i in self.index.items()]
+        return sorted(rows, key=lambda r: -r[1])
+
+
+def rate_matches(matches, book=None):
+    """
+    Rate a list of (team_a, team_b, score_a, score_b) matches in order.
+
+    Only 2-vs-2 matches count. Returns a RatingBook (a new one unless
+    `book` is given to continue from).
+    """
+    book = book or RatingBook()
+    matches = [m for m in matches if len(m[0]) == 2 and len(m[1]) == 2]
+    if not matches:
+        return book
+
+    players = np.array(
+        [[book._row(n) for n in m[0]] + [book._row(n) for n in m[1]] for m in matches],
+        dtype=np.int64,
+    )
+    result = outcome([m[2] for m in matches], [m[3] for m in matches])
+
+    # Layer = 1 + latest layer any of the four players already appeared in
+    # (plain lists: this is the one per-match loop, and scalar NumPy indexing is slow)
+    last = [-1] * len(book.names)
+    layers = []
+    for p0, p1, p2, p3 in players.tolist():
+        n = max(last[p0], last[p1], last[p2], last[p3]) + 1
+        last[p0] = last[p1] = last[p2] = last[p3] = n
+        layers.append(n)
+    layer = np.array(layers, dtype=np.int64)
+
+    order = np.argsort(layer, kind="stable")
+    bounds = np.searchsorted(layer[order], np.arange(layer.max() + 2))
+    rating, games = book.rating, book.games
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        idx = order[lo:hi]
+        a, b = players[idx, :2], players[idx, 2:]
+        e = expected(rating[a].sum(axis=1) / 2, rating[b].sum(axis=1) / 2)
+        delta = (result[idx] - e)[:, None]
+        # Players are distinct within a layer, so plain fancy assignment is safe
+        rating[a] += k_factor(games[a]) * delta
+        rating[b] -= k_factor(games[b]) * delta
+        games[a] += 1
+        games[b] += 1
+    return book
+
+def matches_from_history(history):
+    """AutoStack history rows -> (team_a, team_b, score_a, score_b) tuples."""
+    return [
+        (
+            [n for n in row["Team A"].split(" & ") if n],
+            [n for n in row["Team B"].split(" & ") if n],
+            row["Score A"],
+            row["Score B"],
+        )
+        for row in history
+    ]
@@ -0,0 +1,21 @@
+-- Finished Auto Stack matches, appended in batches by match_log.py
+create table if not exists matches (
+    id          bigint generated always as identity primary key,
+    club        text        not null,
+    event       text        not null,
+    court       integer,
+    team_a      text[]      not null,
+    team_b      text[]      not null,
+    players     text[]      not null,  -- team_a || team_b, for per-player lookups
+    score_a     integer     not null,
+    score_b     integer     not null,
+    winner      text        not null,  -- 'Team A' / 'Team B' / 'DRAW'
+    started_at  timestamp,
+    ended_at    timestamp   not null,
+    created_at  timestamptz not null default now()
+);
+
+-- player_matches(): players @> array[name] ... order by ended_at desc
+create index if not exists matches_players_gin on matches using gin (players);
+create index if not exists matches_ended_at_idx on matches (ended_at desc);
+create index if not exists matches_club_ended_at_idx on matches (club, ended_at desc);
@@ -0,0 +1,554 @@
+"""Auto Stack match engine.
+
+Event state lives here instead of in ``st.session_state`` so a background
+worker can fill courts, track match clocks and flush results to Supabase
+even when no browser tab is open. Pages only call the mutators below and
+render ``snapshot()``.
+"""
+import random
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+from match_log import MatchLog, match_row
+from pairing import CoOccurrence
+from ratings import RatingBook, matches_from_history, rate_matches
+from supabase_client import get_supabase
+
+TICK_SECONDS = 1.0
+MATCH_TIME_LIMIT_MINUTES = 20
+ON_DECK_SIZE = 3
+
+
+# ======================================================
+# HELPERS
+# ======================================================
+def safe_group(players):
+    skills = {p[1] for p in players}
+    return not ("BEGINNER" in skills and "INTERMEDIATE" in skills)
+
+def first_safe_four(players):
+    """
+    First safe combination of 4 players in queue order, or None.
+
+    Same pick as scanning itertools.combinations(players, 4) for the first
+    safe_group, in one pass: a safe group has no INTERMEDIATE or no BEGINNER,
+    so the answer is the earlier of the first four non-intermediates and the
+    first four non-beginners.
+    """
+    no_int, no_beg = [], []
+    for i, p in enumerate(players):
+        if p[1] != "INTERMEDIATE" and len(no_int) < 4:
+            no_int.append(i)
+        if p[1] != "BEGINNER" and len(no_beg) < 4:
+            no_beg.append(i)
+    candidates = [c for c in (no_int, no_beg) if len(c) == 4]
+    if not candidates:
+        return None
+    return [players[i] for i in min(candidates)]
+
+def _deep_sizeof(obj, seen=None):
+    """sys.getsizeof summed over nested dicts/lists/tuples/sets, counting shared objects once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+# ======================================================
+# EVENT STATE
+# ======================================================
+class StackEvent:
+    """One club session: queue, courts, scores and history behind a lock."""
+
+    def __init__(self, club, name):
+        self.club = club
+        self.event_name = name
+        self.name = f"{club}/{name}"
+        self.lock = threading.RLock()
+        self.match_log = MatchLog()
+        self.version = 0
+        self._rendered = {}
+        self.reset()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def reset(self):
+        with self.lock:
+            self.queue = deque()
+            self.on_deck = deque()
+            self.courts = {}
+            self.locked = {}
+            self.scores = {}
+            self.history = []
+            self.started = False
+            self.court_count = 2
+            self.players = {}
+            self.pairs = CoOccurrence()
+            self.ratings = RatingBook()
+            self.match_start_time = {}
+            self.elapsed = {}
+            self.overtime = set()
+            self.dirty_players = set()
+            self.last_error = None
+            self._changed()
+
+    def _changed(self):
+        """Bump the state version; call (under the lock) after any mutation."""
+        self.version += 1
+
+    # ================= PLAYERS =================
+    def add_player(self, name, skill, dupr):
+        """Add a player to the back of the queue. Returns False on duplicates."""
+        with self.lock:
+            if name in self.players:
+                return False
+            self.queue.append((name, skill, dupr))
+            self.players[name] = {"dupr": dupr, "games": 0, "wins": 0, "losses": 0}
+            self._rebuild_on_deck()
+            self._changed()
+        self.wake()
+        return True
+
+    def delete_player(self, name):
+        with self.lock:
+            self.queue = deque([p for p in self.queue if p[0] != name])
+            self._drop_on_deck_from(name)
+            for cid, teams in self.courts.items():
+                if not teams:
+                    continue
+                new_teams = [[p for p in team if p[0] != name] for team in teams]
+                if len(new_teams[0]) < 2 or len(new_teams[1]) < 2:
+                    self.courts[cid] = None
+                    self.locked[cid] = False
+                    self.match_start_time.pop(cid, None)
+                else:
+                    self.courts[cid] = new_teams
+            self.players.pop(name, None)
+            self._changed()
+        self.wake()
+
+    # ================= COURTS =================
+    def set_court_count(self, count):
+        with self.lock:
+            self.court_count = count
+            self._changed()
+
+    def start_games(self):
+        with self.lock:
+            self.started = True
+            self.courts = {i: None for i in range(1, self.court_count + 1)}
+            self.locked = {i: False for i in self.courts}
+            self.scores = {i: [0, 0] for i in self.courts}
+            self._changed()
+        self.wake()
+
+    # ================= ON DECK =================
+    # The next ON_DECK_SIZE foursomes are kept precomputed: each is the first
+    # safe combination (in queue order) of the waiting players not already on
+    # deck, i.e. exactly what repeated take_four_safe calls would pick. Taking
+    # the head leaves the rest valid and removing a player only invalidates
+    # their foursome onwards. New arrivals can pull an earlier-waiting group
+    # forward, so appends re-pick the deck (K linear passes, no combinations).
+    def _rebuild_on_deck(self):
+        self.on_deck = deque()
+        self._refill_on_deck()
+
+    def _refill_on_deck(self):
+        if len(self.on_deck) >= ON_DECK_SIZE:
+            return
+        taken = {p[0] for four in self.on_deck for p in four}
+        pool = [p for p in self.queue if p[0] not in taken]
+        while len(self.on_deck) < ON_DECK_SIZE:
+            four = first_safe_four(pool)
+            if not four:
+                break
+            self.on_deck.append(four)
+            names = {p[0] for p in four}
+            pool = [p for p in pool if p[0] not in names]
+
+    def _drop_on_deck_from(self, name):
+        """Drop the foursome holding `name` and every one after it."""
+        for i, four in enumerate(self.on_deck):
+            if any(p[0] == name for p in four):
+                for _ in range(len(self.on_deck) - i):
+                    self.on_deck.pop()
+                break
+        self._refill_on_deck()
+
+    def take_four_safe(self):
+        """Pop the next precomputed safe foursome off deck and out of the queue."""
+        if not self.on_deck:
+            return None
+        four = self.on_deck.popleft()
+        names = {p[0] for p in four}
+        self.queue = deque(p for p in self.queue if p[0] not in names)
+        self._refill_on_deck()
+        return four
+
+    def start_match(self, cid):
+        """Start a match on a court if available and not locked."""
+        with self.lock:
+            if self.locked.get(cid, False):
+                return
+            players = self.take_four_safe()
+            if not players:
+                return
+            # Least-repeated of the three splits, then the most even on
+            # rating; full ties keep queue order
+            self.courts[cid] = self.pairs.best_teams(players, self.ratings)
+            self.locked[cid] = True
+            self.scores[cid] = [0, 0]
+            self.match_start_time[cid] = datetime.now()
+            self._changed()
+
+    def auto_fill(self):
+        """Automatically fill empty courts if the queue has enough players."""
+        with self.lock:
+            if not self.started:
+                return
+            for cid in range(1, self.court_count + 1):
+                if self.courts.get(cid) is None:
+                    self.start_match(cid)
+
+    def finish_match(self, cid, score_a, score_b):
+        """Finish a match, update stats and return players to queue in FCFS order."""
+        with self.lock:
+            teams = self.courts.get(cid)
+            if not teams:
+                return
+            self.scores[cid] = [score_a, score_b]
+            teamA, teamB = teams
+
+            if score_a > score_b:
+                winner = "Team A"
+                winners, losers = teamA, teamB
+            elif score_b > score_a:
+                winner = "Team B"
+                winners, losers = teamB, teamA
+            else:
+                winner = "DRAW"
+                winners = losers = []
+
+            # ================= UPDATE PLAYER STATS =================
+            for p in teamA + teamB:
+                self.players[p[0]]["games"] += 1
+                self.dirty_players.add(p[0])
+            for p in winners:
+                self.players[p[0]]["wins"] += 1
+            for p in losers:
+                self.players[p[0]]["losses"] += 1
+            self.pairs.record([p[0] for p in teamA], [p[0] for p in teamB])
+            self.ratings.update([p[0] for p in teamA], [p[0] for p in teamB], score_a, score_b)
+
+            # ================= RECORD MATCH HISTORY =================
+            end_time = datetime.now()
+            start_time = self.match_start_time.get(cid)
+            if start_time:
+                duration = round((end_time - start_time).total_seconds() / 60, 2)
+                start_str = start_time.strftime("%H:%M:%S")
+                end_str = end_time.strftime("%H:%M:%S")
+            else:
+                duration = 0
+                start_str = ""
+                end_str = ""
+
+            self.match_log.append(match_row(
+                self.club, self.event_name, cid,
+                [p[0] for p in teamA], [p[0] for p in teamB],
+                score_a, score_b, winner, start_time, end_time
+            ))
+            self.history.append({
+                "Court": cid,
+                "Team A": " & ".join(p[0] for p in teamA),
+                "Team B": " & ".join(p[0] for p in teamB),
+                "Score A": score_a,
+                "Score B": score_b,
+                "Winner": winner,
+                "Start Time": start_str,
+                "End Time": end_str,
+                "Duration (Minutes)": duration
+            })
+
+            # ================= RESET COURT =================
+            self.match_start_time.pop(cid, None)
+            self.elapsed.pop(cid, None)
+            self.overtime.discard(cid)
+            self.courts[cid] = None
+            self.locked[cid] = False
+            self.scores[cid] = [0, 0]
+
+            # ================= RETURN PLAYERS TO QUEUE =================
+            self.queue.extend(teamA + teamB)
+            self._rebuild_on_deck()
+            self._changed()
+        self.wake()
+
+    def winner_winner(self, cid):
+        """Keep winners on court and rotate losers to queue. Returns a warning or None."""
+        with self.lock:
+            teams = self.courts.get(cid)
+            if not teams:
+                return "No players on court to apply Winner Winner"
+
+            scoreA, scoreB = self.scores.get(cid, [0, 0])
+            teamA, teamB = teams
+            if scoreA > scoreB:
+                winners, losers = teamA, teamB
+            elif scoreB > scoreA:
+                winners, losers = teamB, teamA
+            else:
+                return "Match is a draw, cannot use Winner Winner"
+
+            self.queue.extend(losers)
+            self._rebuild_on_deck()
+            self.courts[cid] = [winners[:2], winners[2:]] if len(winners) > 2 else [winners, []]
+            self.scores[cid] = [0, 0]
+            self._changed()
+        return None
+
+    def shuffle_teams(self, cid):
+        with self.lock:
+            teams = self.courts.get(cid)
+            if not teams:
+                return
+            players = teams[0] + teams[1]
+            random.shuffle(players)
+            self.courts[cid] = [players[:2], players[2:]]
+            self._changed()
+
+    def rematch(self, cid):
+        with self.lock:
+            self.scores[cid] = [0, 0]
+            self._changed()
+
+    def swap_players(self, cid, out_name, in_name):
+        """Swap a court player with a waiting player, keeping both positions."""
+        with self.lock:
+            teams = self.courts.get(cid)
+            if not teams:
+                return
+            flat_court = teams[0] + teams[1]
+            queue_list = list(self.queue)
+            court_index = next((i for i, p in enumerate(flat_court) if p[0] == out_name), None)
+            queue_index = next((i for i, p in enumerate(queue_list) if p[0] == in_name), None)
+            if court_index is None or queue_index is None:
+                return
+            flat_court[court_index], queue_list[queue_index] = queue_list[queue_index], flat_court[court_index]
+            self.courts[cid] = [flat_court[:2], flat_court[2:]]
+            self.queue = deque(queue_list)
+            self._rebuild_on_deck()
+            self._changed()
+
+    # ================= BACKGROUND WORK =================
+    def track_clocks(self):
+        """Refresh elapsed match time per court and flag courts over the limit."""
+        now = datetime.now()
+        with self.lock:
+            self.elapsed = {
+                cid: int((now - start).total_seconds())
+                for cid, start in self.match_start_time.items()
+            }
+            self.overtime = {
+                cid for cid, secs in self.elapsed.items()
+                if secs >= MATCH_TIME_LIMIT_MINUTES * 60
+            }
+
+    def flush_stats(self):
+        """Push games/wins of players touched since the last flush to Supabase."""
+        with self.lock:
+            if not self.dirty_players:
+                return
+            names = self.dirty_players
+            self.dirty_players = set()
+            rows = {
+                n: {"games": self.players[n]["games"], "wins": self.players[n]["wins"]}
+                for n in names if n in self.players
+            }
+        try:
+            supabase = get_supabase()
+            for name, stats in rows.items():
+                supabase.table("players").update(stats).eq("name", name).execute()
+            self.last_error = None
+        except Exception as e:
+            # Keep them dirty so the next tick retries
+            with self.lock:
+                self.dirty_players |= names
+            self.last_error = f"Supabase update failed: {e}"
+
+    def flush_matches(self):
+        """Send buffered match rows to the matches table in one insert."""
+        try:
+            self.match_log.flush()
+        except Exception as e:
+            self.last_error = f"Saving matches failed: {e}"
+
+    def end_session(self):
+        """Flush everything still buffered (before a reset, eviction or shutdown)."""
+        self.flush_stats()
+        self.flush_matches()
+
+    def tick(self):
+        self.auto_fill()
+        self.track_clocks()
+        self.flush_stats()
+        if self.match_log.due():
+            self.flush_matches()
+
+    def wake(self):
+        """Ask the worker to tick now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(TICK_SECONDS)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.tick()
+            except Exception as e:
+                self.last_error = f"Background worker error: {e}"
+
+    def start_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(
+            target=self._run, name=f"autostack-{self.name}", daemon=True
+        )
+        self._worker.start()
+
+    def stop_worker(self):
+        self._stop.set()
+        self._wake.set()
+        if self._worker:
+            self._worker.join(timeout=TICK_SECONDS * 2)
+        self._worker = None
+
+    # ================= READ SIDE =================
+    def snapshot(self):
+        """Copy of the state for rendering; safe to read without the lock."""
+        with self.lock:
+            return {
+                "queue": list(self.queue),
+                "on_deck": [list(four) for four in self.on_deck],
+                "courts": {
+                    cid: [list(t) for t in teams] if teams else None
+                    for cid, teams in self.courts.items()
+                },
+                "locked": dict(self.locked),
+                "scores": {cid: list(s) for cid, s in self.scores.items()},
+                "history": list(self.history),
+                "started": self.started,
+                "court_count": self.court_count,
+                "players": {n: dict(d) for n, d in self.players.items()},
+                "ratings": {n: round(self.ratings.get(n)) for n in self.players},
+                "started_at": {cid: t.strftime("%H:%M") for cid, t in self.match_start_time.items()},
+                "elapsed": dict(self.elapsed),
+                "overtime": set(self.overtime),
+                "last_error": self.last_error,
+                "version": self.version,
+            }
+
+    def rendered(self, key, stamp, build):
+        """
+        Markup for `key` built by build(), reused while `stamp` is unchanged.
+
+        Pages pass the snapshot's version (plus anything else the markup shows,
+        like overtime flags) as the stamp, so idle reruns from every tab share
+        one build per change instead of re-joining the queue and courts.
+        """
+        cached = self._rendered.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        markup = build()
+        self._rendered[key] = (stamp, markup)
+        return markup
+
+    def memory_bytes(self):
+        """Approximate bytes held by this event's state containers."""
+        with self.lock:
+            return (_deep_sizeof(self.to_dict(pending_matches=True)) + _deep_sizeof(self.elapsed)
+                    + self.pairs.partner.nbytes + self.pairs.opponent.nbytes
+                    + self.ratings.rating.nbytes + self.ratings.games.nbytes)
+
+    def pair_matrix(self, kind="partner"):
+        """(names, counts) copy of the partner or opponent co-occurrence matrix."""
+        with self.lock:
+            return self.pairs.matrix(kind)
+
+    # ================= PROFILES =================
+    def to_dict(self, pending_matches=False):
+        """
+        Saveable state. Unflushed match rows are only included for the event
+        store's eviction files: a profile can be loaded after the worker has
+        already inserted them, which would insert them twice.
+        """
+        with self.lock:
+            # Convert datetime objects to strings
+            match_start_time_str = {str(k): v.strftime("%Y-%m-%d %H:%M:%S")
+                                    for k, v in self.match_start_time.items()}
+            # Copies, like snapshot(): callers serialise this after the lock
+            # is released while the worker keeps changing the live state
+            data = {
+                "queue": list(self.queue),
+                "courts": {
+                    cid: [list(t) for t in teams] if teams else None
+                    for cid, teams in self.courts.items()
+                },
+                "locked": dict(self.locked),
+                "scores": {cid: list(s) for cid, s in self.scores.items()},
+                "history": list(self.history),
+                "started": self.started,
+                "court_count": self.court_count,
+                "players": {n: dict(d) for n, d in self.players.items()},
+                "match_start_time": match_start_time_str,
+            }
+            if pending_matches:
+                data["pending_matches"] = self.match_log.pending()
+            return data
+
+    def load_dict(self, data):
+        with self.lock:
+            # Convert keys back to int (VERY IMPORTANT)
+            self.courts = {int(k): v for k, v in data["courts"].items()}
+            self.locked = {int(k): v for k, v in data["locked"].items()}
+            self.scores = {int(k): v for k, v in data["scores"].items()}
+            # JSON turns tuples into lists; the queue compares players by value
+            self.queue = deque(tuple(p) for p in data["queue"])
+            self._rebuild_on_deck()
+            self.courts = {
+                cid: [[tuple(p) for p in team] for team in teams] if teams else None
+                for cid, teams in self.courts.items()
+            }
+            self.history = data["history"]
+            # Rows still buffered here (e.g. a failed flush before a profile
+            # load) are real matches, so saved rows are added, never swapped in
+            for row in data.get("pending_matches", []):
+                self.match_log.append(row)
+            self.pairs = CoOccurrence.from_history(self.history)
+            self.ratings = rate_matches(matches_from_history(self.history))
+            self.started = data["started"]
+            self.court_count = data["court_count"]
+            self.players = data["players"]
+
+            # Restore match_start_time exactly as saved
+            self.match_start_time = {}
+            for k, v in data.get("match_start_time", {}).items():
+                try:
+                    self.match_start_time[int(k)] = datetime.strptime(v, "%Y-%m-%d %H:%M:%S")
+                except Exception:
+                    # fallback if string parsing fails
+                    self.match_start_time[int(k)] = datetime.now()
+            self._changed()
+        self.wake()
+
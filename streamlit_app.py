@@ -1,19 +1,20 @@
 import streamlit as st
+from header_image import background_url, header_photo
 
 st.set_page_config(page_title="Pickleball Manager", layout="centered")
 
 # =========================
 # BACKGROUND IMAGE
 # =========================
-page_bg_img = """
+page_bg_img = f"""
 <style>
-[data-testid="stAppViewContainer"] {
-background-image: url("TDphoto.jpg");
+[data-testid="stAppViewContainer"] {{
+background-image: url("{background_url()}");
 background-size: cover;
 background-position: center;
 background-repeat: no-repeat;
 background-attachment: fixed;
-}
+}}
 </style>
 """
 st.markdown(page_bg_img, unsafe_allow_html=True)
@@ -23,7 +24,7 @@ st.markdown(page_bg_img, unsafe_allow_html=True)
 # =========================
 col1, col2, col3 = st.columns([1,2,1])
 with col2:
-    st.image("TDphoto.jpg", width=300)
+    header_photo(300)
 
 st.title("🏠 TiraDinks Official")
 st.write("Welcome to the TiraDinks Club!")
@@ -1,8 +1,25 @@
-from supabase import create_client
+import os
+
 import streamlit as st
 
+_client = None
+
 def get_supabase():
-    return create_client(
-        st.secrets["SUPABASE_URL"],
-        st.secrets["SUPABASE_KEY"]
-    )
+    """Return the shared Supabase client, creating it on first use."""
+    global _client
+    if _client is None:
+        if os.environ.get("LOCAL_SUPABASE"):
+            # In-memory stand-in for load tests / offline runs
+            from local_supabase import LocalClient
+
+            _client = LocalClient()
+            return _client
+
+        # Imported here so pages that never query the database don't pay for it
+        from supabase import create_client
+
+        _client = create_client(
+            st.secrets["SUPABASE_URL"],
+            st.secrets["SUPABASE_KEY"]
+        )
+    return _client